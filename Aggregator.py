@@ -0,0 +1,338 @@
+"""
+Streaming statistics over any number of games, in constant memory.
+
+A long run can play billions of rounds, far too many GameResults to keep around and summarise afterwards. A
+ResultAggregator instead folds every result into running totals as soon as the game ends:
+  - per seat win counts, draws and cycles
+  - RunningStats (count, mean, variance, min and max, Welford's method) of rounds, wars and longest war per game
+  - Histograms of rounds and of longest war, which also give quantiles (median, 99th percentile, ...)
+None of these grow with the number of games: a Histogram keeps values below 64 exactly and groups larger ones into
+buckets 1/32 of their size wide, so a histogram of game lengths up to a billion rounds has under 900 buckets and its
+quantiles are within about 1.5%.
+
+Aggregators from different workers combine exactly with merge() (Chan's parallel variance formula for RunningStats),
+and checkpoint() writes the whole state to a JSON file (written to a temporary file first and then renamed over the
+old one, so a crash never leaves a half written checkpoint) that load() resumes from.
+
+A ResultAggregator is also a Game sink: it records the GameResult of every game over event and ignores the rest, and
+since it isn't enabled, the Game doesn't even build the other events.
+
+Usage: python3 Aggregator.py --games 10000000 --checkpoint run.json   (run it again to resume)
+"""
+
+from Events import GameOverEvent
+from GameResult import GameResult
+from Simulator import Simulator
+from Tournament import shardSeeds
+from multiprocessing import Pool, cpu_count
+from random import Random
+import argparse
+import json
+import math
+import os
+
+# Histogram buckets: values below 2 * 2**HISTOGRAM_BITS get a bucket each, larger values share buckets that keep their
+# top HISTOGRAM_BITS + 1 bits
+HISTOGRAM_BITS = 5
+HISTOGRAM_EXACT = 1 << HISTOGRAM_BITS
+
+
+class RunningStats(object):
+    """ Count, mean, variance, min and max of a stream of numbers, updated one value at a time (Welford). """
+    __slots__ = ("count", "mean", "m2", "minimum", "maximum")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared differences from the mean
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other:"RunningStats") -> "RunningStats":
+        """ Combines other's values into these stats (Chan et al.), and returns self. """
+        if not other.count:
+            return self
+        if not self.count:
+            for name in self.__slots__:
+                setattr(self, name, getattr(other, name))
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        return self
+
+    def variance(self) -> float:
+        # sample variance
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def stdev(self) -> float:
+        return math.sqrt(self.variance())
+
+    def toDict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @staticmethod
+    def fromDict(fields:dict) -> "RunningStats":
+        stats = RunningStats()
+        for name in stats.__slots__:
+            setattr(stats, name, fields[name])
+        return stats
+
+
+class Histogram(object):
+    """
+    Counts of non-negative integers in log-linear buckets: exact below 2 * HISTOGRAM_EXACT, then HISTOGRAM_EXACT
+    buckets per power of 2. Only buckets that have been hit are stored.
+    """
+    def __init__(self) -> None:
+        self.counts = {}  # bucket index -> count
+        self.total = 0
+
+    @staticmethod
+    def bucket(value:int) -> int:
+        shift = value.bit_length() - HISTOGRAM_BITS - 1
+        if shift <= 0:
+            return value
+        return shift * HISTOGRAM_EXACT + (value >> shift)
+
+    @staticmethod
+    def bounds(bucket:int) -> tuple:
+        """ The lowest and highest value counted in bucket. """
+        shift = max(0, bucket // HISTOGRAM_EXACT - 1)
+        low = (bucket - shift * HISTOGRAM_EXACT) << shift
+        return low, low + (1 << shift) - 1
+
+    def add(self, value:int, count:int = 1) -> None:
+        bucket = self.bucket(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += count
+
+    def merge(self, other:"Histogram") -> "Histogram":
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += other.total
+        return self
+
+    def quantile(self, fraction:float) -> float:
+        """ The value below which fraction of the counted values lie, the middle of its bucket. 0 if empty. """
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= fraction * self.total:
+                low, high = self.bounds(bucket)
+                return (low + high) / 2
+        return 0.0
+
+    def bins(self) -> list:
+        """ (lowest value, highest value, count) of every bucket that was hit, in order. """
+        return [self.bounds(bucket) + (self.counts[bucket],) for bucket in sorted(self.counts)]
+
+    def toDict(self) -> dict:
+        return {"total": self.total, "counts": [[bucket, count] for bucket, count in sorted(self.counts.items())]}
+
+    @staticmethod
+    def fromDict(fields:dict) -> "Histogram":
+        histogram = Histogram()
+        histogram.total = fields["total"]
+        histogram.counts = {bucket: count for bucket, count in fields["counts"]}
+        return histogram
+
+
+class ResultAggregator(object):
+    """
+    Folds GameResults into constant memory statistics: add() records one result, consume() a whole stream of them.
+    progress is free form (JSON compatible) state saved with every checkpoint, for the caller to resume from.
+    """
+    enabled = False  # as a Game sink, only the game over event is needed
+
+    def __init__(self, num_seats:int = 2) -> None:
+        self.games = 0
+        self.wins = [0] * num_seats  # grows if a higher seat wins
+        self.draws = 0
+        self.cycles = 0
+        self.rounds = RunningStats()
+        self.wars = RunningStats()
+        self.longestWar = RunningStats()
+        self.roundHistogram = Histogram()
+        self.warHistogram = Histogram()  # of the longest War of every game
+        self.progress = {}
+
+    def add(self, result:GameResult) -> None:
+        self.games += 1
+        if result.winner is None:
+            self.draws += 1
+            if result.cycleLength:
+                self.cycles += 1
+        else:
+            if result.winner >= len(self.wins):
+                self.wins.extend([0] * (result.winner + 1 - len(self.wins)))
+            self.wins[result.winner] += 1
+        self.rounds.add(result.rounds)
+        self.wars.add(result.wars)
+        self.longestWar.add(result.longestWar)
+        self.roundHistogram.add(result.rounds)
+        self.warHistogram.add(result.longestWar)
+
+    def consume(self, results, path:str = None, every:int = 100000) -> "ResultAggregator":
+        """
+        Adds every GameResult of the iterable results (e.g. Simulator.iterGames()), checkpointing to path every
+        every games if a path is given. Returns self.
+        """
+        for result in results:
+            self.add(result)
+            if path is not None and not self.games % every:
+                self.checkpoint(path)
+        return self
+
+    def emit(self, event) -> None:
+        if isinstance(event, GameOverEvent):
+            self.add(event.result)
+
+    def flush(self) -> None:
+        pass
+
+    def merge(self, other:"ResultAggregator") -> "ResultAggregator":
+        """ Adds everything other has recorded into this aggregator, and returns self. """
+        self.games += other.games
+        if len(other.wins) > len(self.wins):
+            self.wins.extend([0] * (len(other.wins) - len(self.wins)))
+        for seat, wins in enumerate(other.wins):
+            self.wins[seat] += wins
+        self.draws += other.draws
+        self.cycles += other.cycles
+        self.rounds.merge(other.rounds)
+        self.wars.merge(other.wars)
+        self.longestWar.merge(other.longestWar)
+        self.roundHistogram.merge(other.roundHistogram)
+        self.warHistogram.merge(other.warHistogram)
+        return self
+
+    def winRates(self) -> list:
+        return [wins / self.games if self.games else 0.0 for wins in self.wins]
+
+    def report(self) -> str:
+        lines = ["Games played: {:,}".format(self.games)]
+        for seat, rate in enumerate(self.winRates()):
+            lines.append("  Player {} win rate: {:.4f}".format(seat, rate))
+        lines.append("  Draws: {:,} ({:,} repeating, {:,} at the round limit)".format(self.draws, self.cycles, self.draws - self.cycles))
+        histogram = self.roundHistogram
+        lines.append("  Rounds per game: mean {:.1f}, stdev {:.1f}, median {:.0f}, 90% {:.0f}, 99% {:.0f}, max {}".format(
+            self.rounds.mean, self.rounds.stdev(), histogram.quantile(0.5), histogram.quantile(0.9), histogram.quantile(0.99),
+            self.rounds.maximum))
+        lines.append("  Wars per game: mean {:.1f}, stdev {:.1f}".format(self.wars.mean, self.wars.stdev()))
+        lines.append("  Longest War: " + ", ".join("{} ties: {:,}".format(low, count) for low, high, count in self.warHistogram.bins()))
+        return "\n".join(lines)
+
+    def toDict(self) -> dict:
+        return {"games": self.games, "wins": self.wins, "draws": self.draws, "cycles": self.cycles,
+                "rounds": self.rounds.toDict(), "wars": self.wars.toDict(), "longestWar": self.longestWar.toDict(),
+                "roundHistogram": self.roundHistogram.toDict(), "warHistogram": self.warHistogram.toDict(),
+                "progress": self.progress}
+
+    @staticmethod
+    def fromDict(fields:dict) -> "ResultAggregator":
+        aggregator = ResultAggregator()
+        aggregator.games = fields["games"]
+        aggregator.wins = fields["wins"]
+        aggregator.draws = fields["draws"]
+        aggregator.cycles = fields["cycles"]
+        aggregator.rounds = RunningStats.fromDict(fields["rounds"])
+        aggregator.wars = RunningStats.fromDict(fields["wars"])
+        aggregator.longestWar = RunningStats.fromDict(fields["longestWar"])
+        aggregator.roundHistogram = Histogram.fromDict(fields["roundHistogram"])
+        aggregator.warHistogram = Histogram.fromDict(fields["warHistogram"])
+        aggregator.progress = fields["progress"]
+        return aggregator
+
+    def checkpoint(self, path:str) -> None:
+        """ Saves the aggregator to path atomically: readers see either the previous checkpoint or this one. """
+        temp = path + ".tmp"
+        with open(temp, "w") as file:
+            json.dump(self.toDict(), file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp, path)
+
+    @staticmethod
+    def load(path:str) -> "ResultAggregator":
+        with open(path) as file:
+            return ResultAggregator.fromDict(json.load(file))
+
+
+def aggregateShard(args:tuple) -> ResultAggregator:
+    """ Worker entry point: plays num_games seeded games and returns only their aggregated statistics. """
+    num_games, seed, round_limit, detect_cycles = args
+    sim = Simulator(round_limit=round_limit, rng=Random(seed), detect_cycles=detect_cycles)
+    return ResultAggregator().consume(sim.iterGames(num_games))
+
+
+def aggregateGames(num_games:int, seed:int = 0, num_workers:int = None, round_limit:int = 10000, detect_cycles:bool = False, path:str = None, every:int = 100000) -> ResultAggregator:
+    """
+    Plays num_games games across num_workers processes in batches of every games, merging each batch's aggregators
+    and checkpointing to path (if given) after every batch. If path already holds a checkpoint of the same run (same
+    seed, workers, round_limit, detect_cycles and batch size), the run resumes after its last completed batch; a
+    checkpoint of any other run raises ValueError, since its games would be mixed with different ones. Batch b's
+    workers are seeded from (seed, b), so a resumed run plays exactly the games an uninterrupted one would.
+    """
+    num_workers = num_workers or cpu_count()
+    # everything that decides which games a batch plays, saved with the checkpoint
+    run = {"seed": seed, "workers": num_workers, "round_limit": round_limit, "detect_cycles": detect_cycles,
+           "every": every}
+    aggregator = None
+    if path is not None and os.path.exists(path):
+        aggregator = ResultAggregator.load(path)
+        different = [name for name, value in run.items() if aggregator.progress.get(name) != value]
+        if different:
+            raise ValueError("{} is a checkpoint of a run with a different {}".format(path, ", ".join(different)))
+    if aggregator is None:
+        aggregator = ResultAggregator()
+        aggregator.progress = dict(run, batches=0)
+    pool = Pool(num_workers) if num_workers > 1 else None
+    try:
+        while aggregator.games < num_games:
+            batch = aggregator.progress["batches"]
+            size = min(every, num_games - aggregator.games)
+            base, extra = divmod(size, num_workers)
+            seeds = shardSeeds(seed + (batch << 64), num_workers)
+            shards = [(base + (1 if idx < extra else 0), seeds[idx], round_limit, detect_cycles)
+                      for idx in range(num_workers) if base or idx < extra]
+            # merged in shard order, so the floating point totals don't depend on which worker finishes first
+            results = pool.imap(aggregateShard, shards) if pool else map(aggregateShard, shards)
+            for shardAggregator in results:
+                aggregator.merge(shardAggregator)
+            aggregator.progress["batches"] = batch + 1
+            if path is not None:
+                aggregator.checkpoint(path)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return aggregator
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play many headless War games and aggregate their statistics.")
+    parser.add_argument("--games", type=int, default=100000, help="total number of games to play")
+    parser.add_argument("--seed", type=int, default=0, help="master seed, every batch's seeds are derived from it")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--round-limit", type=int, default=10000, help="rounds before a game is called a draw")
+    parser.add_argument("--detect-cycles", action="store_true", help="stop games as draws once their hands repeat")
+    parser.add_argument("--checkpoint", default=None, help="save progress to this file after every batch, and resume from it")
+    parser.add_argument("--every", type=int, default=100000, help="games per batch (between checkpoints)")
+    args = parser.parse_args()
+
+    print(aggregateGames(args.games, args.seed, args.workers, args.round_limit, args.detect_cycles, args.checkpoint, args.every).report())
@@ -0,0 +1,201 @@
+"""
+Predicts how a deal will play out before playing it.
+
+dealFeatures() describes a 2 player deal (as dealt by Deck.splitDeck(), or as card values): how many cards of each
+rank every player holds, their Aces and high cards, and how likely ties are. OutcomeEstimator turns those features
+into a quick estimate of the outcome (each player's chance to win, the chance of a draw) and of how many rounds the
+game will take, calibrated against games actually played by the Simulator. Runners can use the estimates to schedule
+the longest games first (longestFirst(), balanceShards()).
+
+Calibration matters more than the features here. With the fixed pickup order nearly every deal ends up repeating
+forever, so most games run until the cycle is detected or the round limit is hit, and the odd game that does finish
+does so early. The estimator therefore keeps empirical outcome rates per feature bucket, shrunk towards the overall
+rates, instead of trusting any feature blindly: where the features say little, the estimate falls back to the plain
+average for the round limit it was calibrated with.
+
+decidedWinner() is the exact counterpart for early cut off: it recognises positions whose result is already certain.
+Simulator(cutoff=True) makes the same check (in a cheaper form) after every round and skips playing them out.
+"""
+
+from Simulator import Simulator, dealValues
+from operator import itemgetter
+import json
+
+ACE = 14
+HIGH_CARD = 11  # Jack and above
+
+
+def cardValues(hand:list) -> list:
+    # accepts Card lists (from Deck.splitDeck()) as well as plain value lists
+    if hand and hasattr(hand[0], "val"):
+        return [card.val for card in hand]
+    return list(hand)
+
+
+class DealFeatures(object):
+    """
+    Features of a deal. For each player: rankCounts (13 counts, index 0 for 2s up to 12 for Aces), aces, highCards
+    (Jacks and above) and strength (mean card value). For the deal: alignedTies, the turns of the first pass through
+    the hands that are ties (cards at the same position with the same value), and tieChance, the chance that two
+    cards drawn one from each hand tie.
+    """
+    __slots__ = ("rankCounts", "aces", "highCards", "strength", "alignedTies", "tieChance")
+
+    def __init__(self, hands:list) -> None:
+        hands = [cardValues(hand) for hand in hands]
+        self.rankCounts = []
+        for hand in hands:
+            counts = [0] * 13
+            for value in hand:
+                counts[value - 2] += 1
+            self.rankCounts.append(counts)
+        self.aces = [counts[ACE - 2] for counts in self.rankCounts]
+        self.highCards = [sum(counts[HIGH_CARD - 2:]) for counts in self.rankCounts]
+        self.strength = [sum(hand) / len(hand) if hand else 0.0 for hand in hands]
+        first, second = hands[0], hands[1]
+        self.alignedTies = sum(1 for a, b in zip(first, second) if a == b)
+        pairs = len(first) * len(second)
+        self.tieChance = sum(a * b for a, b in zip(self.rankCounts[0], self.rankCounts[1])) / pairs if pairs else 0.0
+
+    def bucket(self) -> tuple:
+        """ The coarse bucket OutcomeEstimator calibrates on: Ace difference, and 0, 1 or 2+ aligned ties. """
+        return (self.aces[0] - self.aces[1], min(self.alignedTies, 2))
+
+    def __repr__(self) -> str:
+        return "DealFeatures(aces={}, highCards={}, strength=[{:.2f}, {:.2f}], alignedTies={}, tieChance={:.3f})".format(
+            self.aces, self.highCards, self.strength[0], self.strength[1], self.alignedTies, self.tieChance)
+
+
+def dealFeatures(hands:list) -> DealFeatures:
+    """ Computes the DealFeatures of a 2 player deal, given as lists of Cards or of card values. """
+    return DealFeatures(hands)
+
+
+class Estimate(object):
+    """ What OutcomeEstimator expects of a deal: winProbs per player, drawProb and the expected number of rounds. """
+    __slots__ = ("winProbs", "drawProb", "rounds")
+
+    def __init__(self, winProbs:list, drawProb:float, rounds:float) -> None:
+        self.winProbs = winProbs
+        self.drawProb = drawProb
+        self.rounds = rounds
+
+    def likelyWinner(self, confidence:float = 0.5):
+        """ The player more likely than confidence to win, or None. """
+        for seat, prob in enumerate(self.winProbs):
+            if prob > confidence:
+                return seat
+        return None
+
+    def __repr__(self) -> str:
+        return "Estimate(winProbs=[{:.3f}, {:.3f}], drawProb={:.3f}, rounds={:.0f})".format(
+            self.winProbs[0], self.winProbs[1], self.drawProb, self.rounds)
+
+
+class OutcomeEstimator(object):
+    """
+    Estimates outcomes and round counts from DealFeatures. calibrate() plays num_games games with the Simulator (with
+    cycle detection, under round_limit) and records, per feature bucket, how the games ended and how long they took.
+    estimate() then blends the bucket's rates with the overall rates, weighting the overall rates like prior_games
+    extra games, so sparse buckets stay close to the average.
+    """
+    def __init__(self, round_limit:int = 10000, prior_games:int = 20) -> None:
+        self.round_limit = round_limit
+        self.prior_games = prior_games
+        self.totals = [0, 0, 0, 0, 0.0]  # wins for seat 0, wins for seat 1, draws, games, summed rounds
+        self.buckets = {}                # DealFeatures.bucket() -> totals like the above
+
+    def add(self, features:DealFeatures, result) -> None:
+        """ Records one played game's GameResult. """
+        for totals in (self.totals, self.buckets.setdefault(features.bucket(), [0, 0, 0, 0, 0.0])):
+            totals[2 if result.winner is None else result.winner] += 1
+            totals[3] += 1
+            totals[4] += result.rounds
+
+    def calibrate(self, num_games:int = 2000, rng = None) -> "OutcomeEstimator":
+        """ Plays num_games freshly dealt games to calibrate on, and returns self. """
+        sim = Simulator(round_limit=self.round_limit, detect_cycles=True)
+        for game in range(num_games):
+            hands = dealValues(2, rng)
+            self.add(DealFeatures(hands), sim.playHands(*hands))
+        return self
+
+    def estimate(self, hands:list) -> Estimate:
+        """ Estimates the outcome of a deal (Card or value lists). Needs a calibrated estimator. """
+        return self.estimateFeatures(DealFeatures(hands))
+
+    def estimateFeatures(self, features:DealFeatures) -> Estimate:
+        overall = self.totals
+        if not overall[3]:
+            raise ValueError("the estimator has not been calibrated")
+        bucket = self.buckets.get(features.bucket(), [0, 0, 0, 0, 0.0])
+        weight = self.prior_games / overall[3]
+        games = bucket[3] + self.prior_games
+        rates = [(bucket[idx] + weight * overall[idx]) / games for idx in range(3)]
+        rounds = (bucket[4] + weight * overall[4]) / games
+        return Estimate(rates[:2], rates[2], rounds)
+
+    def toDict(self) -> dict:
+        return {"round_limit": self.round_limit, "prior_games": self.prior_games, "totals": self.totals,
+                "buckets": [[list(key), totals] for key, totals in sorted(self.buckets.items())]}
+
+    @staticmethod
+    def fromDict(fields:dict) -> "OutcomeEstimator":
+        estimator = OutcomeEstimator(fields["round_limit"], fields["prior_games"])
+        estimator.totals = fields["totals"]
+        estimator.buckets = {tuple(key): totals for key, totals in fields["buckets"]}
+        return estimator
+
+    def save(self, path:str) -> None:
+        """ Stores the calibration as JSON, so it can be loaded instead of calibrating again. """
+        with open(path, "w") as file:
+            json.dump(self.toDict(), file)
+
+    @staticmethod
+    def load(path:str) -> "OutcomeEstimator":
+        with open(path) as file:
+            return OutcomeEstimator.fromDict(json.load(file))
+
+
+def longestFirst(deals:list, estimator:OutcomeEstimator) -> list:
+    """
+    Returns the deals ordered by estimated rounds, longest first. Starting the long games first keeps workers from
+    being left with one long game at the end of a batch.
+    """
+    return sorted(deals, key=lambda hands: estimator.estimate(hands).rounds, reverse=True)
+
+
+def balanceShards(deals:list, num_shards:int, estimator:OutcomeEstimator) -> list:
+    """
+    Splits deals into num_shards lists with about the same estimated rounds each: longest first, every deal goes to
+    the shard with the least estimated work so far.
+    """
+    shards = [[] for shard in range(num_shards)]
+    loads = [0.0] * num_shards
+    # each deal's estimate is looked up once, for sorting and for the load
+    estimated = sorted(((estimator.estimate(hands).rounds, hands) for hands in deals), key=itemgetter(0), reverse=True)
+    for rounds, hands in estimated:
+        shard = loads.index(min(loads))
+        shards[shard].append(hands)
+        loads[shard] += rounds
+    return shards
+
+
+def decidedWinner(hands:list):
+    """
+    Returns (winner, rounds left) if the result of the position is already certain, otherwise None. Hands are the
+    card values at the start of a round, top of the hand first.
+
+    A position is decided when one player's lowest card beats the other player's highest card and the weaker hand is
+    no longer than the stronger one: the stronger player then wins every turn with no ties, and the weaker player runs
+    out before the stronger player gets to the cards they collected, so the game ends after exactly len(weaker hand)
+    more rounds. (Holding every Ace is not enough: the holder can still run out of cards in the middle of a War.)
+    """
+    first, second = hands
+    if not first or not second:
+        return (0 if first else 1, 0) if (first or second) else None
+    if len(second) <= len(first) and min(first) > max(second):
+        return (0, len(second))
+    if len(first) <= len(second) and min(second) > max(first):
+        return (1, len(first))
+    return None
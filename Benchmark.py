@@ -0,0 +1,130 @@
+"""
+Benchmarks for the War game hot paths. Run "python3 Benchmark.py" to print the results.
+
+Each benchmark deals a fixed set of seeded hands, so numbers are comparable between runs on the same machine.
+"""
+
+from MultiSimulator import MultiSimulator
+from Player import Player
+from Simulator import Simulator, dealValues
+import random
+import time
+
+
+class ListHandPlayer(Player):
+    """
+    The original list backed Player hand, kept only as a baseline for benchmarkPlayerHands(). Playing a card shifts
+    the whole list with pop(0), and collecting cards rebuilds the hand by concatenation, so both are O(n).
+    """
+    def __init__(self, name:str, hand:list = None) -> None:
+        self.name = name
+        self.hand = list(hand) if hand else []
+
+    def collectCards(self, cards:list, reverse=True) -> None:
+        if reverse:
+            self.hand = self.hand + cards[::-1]
+        else:
+            self.hand = self.hand + cards
+
+    def playCard(self):
+        card = self.hand.pop(0) if self.hand else False
+        return card
+
+
+def playRounds(p1:Player, p2:Player, round_limit:int) -> int:
+    """
+    Plays up to round_limit rounds between two Players holding card values, using only playCard() and collectCards()
+    the same way Game does. Returns the number of rounds played.
+    """
+    rounds = 0
+    while p1.handCount() and p2.handCount() and rounds < round_limit:
+        rounds += 1
+        tableCards = []
+        while True:
+            card1 = p1.playCard()
+            card2 = p2.playCard()
+            if card1 is False or card2 is False:
+                return rounds
+            tableCards.append(card1)
+            tableCards.append(card2)
+            if card1 != card2:
+                break
+        winner = p1 if card1 > card2 else p2
+        winner.collectCards(tableCards)
+    return rounds
+
+
+def benchmarkPlayerHands(player_class, num_games:int = 20, round_limit:int = 5000, seed:int = 0) -> float:
+    """ Plays num_games seeded games with the given Player class and returns the rounds played per second. """
+    random.seed(seed)
+    deals = [dealValues(2) for game in range(num_games)]
+    totalRounds = 0
+    start = time.perf_counter()
+    for p1cards, p2cards in deals:
+        totalRounds += playRounds(player_class(0, p1cards), player_class(1, p2cards), round_limit)
+    return totalRounds / (time.perf_counter() - start)
+
+
+def benchmarkEngines(num_games:int = 20000, round_limit:int = 1000, seed:int = 0) -> tuple:
+    """
+    Plays the same seeded deals with the scalar Simulator and the NumPy VectorEngine, returns the games per second
+    of each. Dealing is done up front so only game play is timed.
+    """
+    from VectorEngine import VectorEngine  # needs NumPy, so only imported when this benchmark runs
+    rng = random.Random(seed)
+    deals = [dealValues(2, rng) for game in range(num_games)]
+    p1hands = [deal[0] for deal in deals]
+    p2hands = [deal[1] for deal in deals]
+
+    sim = Simulator(round_limit)
+    start = time.perf_counter()
+    for p1cards, p2cards in deals:
+        sim.playHands(p1cards, p2cards)
+    scalarRate = num_games / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    VectorEngine(round_limit).playDeals(p1hands, p2hands)
+    vectorRate = num_games / (time.perf_counter() - start)
+    return scalarRate, vectorRate
+
+
+def benchmarkSeats(seat_counts:tuple = (2, 4, 8, 16, 32, 64), num_games:int = 2000, round_limit:int = 10, seed:int = 0) -> list:
+    """
+    Plays num_games seeded MultiSimulator games at each seat count, with enough decks for 13 cards a seat, and returns
+    (seats, rounds per second, seat turns per second) for each. The round limit is kept below 13 so (almost) every
+    seat is still playing in every round timed. Resolving a turn is O(P), so the seat turns per second should stay
+    roughly flat as the table grows, while rounds per second falls in proportion to the seats.
+    """
+    rates = []
+    for seats in seat_counts:
+        rng = random.Random(seed)
+        decks = max(1, seats // 4)
+        deals = [dealValues(seats, rng, decks) for game in range(num_games)]
+        sim = MultiSimulator(seats, round_limit)
+        totalRounds = 0
+        start = time.perf_counter()
+        for hands in deals:
+            totalRounds += sim.playHands(*hands).rounds
+        elapsed = time.perf_counter() - start
+        rates.append((seats, totalRounds / elapsed, totalRounds * seats / elapsed))
+    return rates
+
+
+if __name__ == "__main__":
+    listRate = benchmarkPlayerHands(ListHandPlayer)
+    dequeRate = benchmarkPlayerHands(Player)
+    print("Player hands (rounds per second)")
+    print("  list hand:  {:>12,.0f}".format(listRate))
+    print("  deque hand: {:>12,.0f}".format(dequeRate))
+    print("  speedup:    {:>12.2f}x".format(dequeRate / listRate))
+
+    scalarRate, vectorRate = benchmarkEngines()
+    print("2 player engines (games per second, 1000 round limit)")
+    print("  Simulator:    {:>10,.0f}".format(scalarRate))
+    print("  VectorEngine: {:>10,.0f}".format(vectorRate))
+    print("  speedup:      {:>10.2f}x".format(vectorRate / scalarRate))
+
+    print("N player engine (MultiSimulator, 13 cards a seat, first 10 rounds)")
+    print("  seats    rounds/s   seat turns/s")
+    for seats, roundRate, turnRate in benchmarkSeats():
+        print("  {:>5} {:>11,.0f} {:>14,.0f}".format(seats, roundRate, turnRate))
@@ -1,11 +1,23 @@
+from sys import intern
+
+SUITS = ("Clubs", "Hearts", "Diamonds", "Spades")
+SUIT_INDEX = {suit: idx for idx, suit in enumerate(SUITS)}
+# display names indexed by card value, values above 10 are the face Cards
+VALUE_NAMES = tuple(str(val) for val in range(11)) + ("Jack", "Queen", "King", "Ace")
+
+
 class Card(object):
     """
     This class describes the Card object. Holds a Card's suit and value. 
     Card's value ranges from 2 to 14, with 2-10 being the standard numerical 
     representations. And 11-14 being the face Cards (Jack, Queen, King, Ace).
+    Cards use __slots__ and interned suit strings to keep them small. Every standard Card also has a compact integer
+    code, (value - 2) * 4 + suit index, which is its position in a freshly constructed Deck (see Deck.construct()).
     """
+    __slots__ = ("suit", "val")
+
     def __init__(self, suit, value) -> None:
-        self.suit = suit
+        self.suit = intern(suit)
         self.val = value
 
     def show(self) -> str:
@@ -13,17 +25,23 @@ class Card(object):
         Getter method to display card suit and value, also converts values above 
         10 to appropriate Face card name (i.e. Jack, Queen, King, Ace)
         """
-        if self.val == 11:
-            card_val = "Jack"
-        elif self.val == 12:
-            card_val = "Queen"
-        elif self.val == 13:
-            card_val = "King"
-        elif self.val == 14:
-            card_val = "Ace"    
-        else:
-            card_val = self.val
-        return "{} of {}".format(card_val, self.suit)
+        return "{} of {}".format(VALUE_NAMES[self.val], self.suit)
+
+    def code(self) -> int:
+        """ Returns the Card's integer code (0-51), the inverse of Card.fromCode() """
+        return (self.val - 2) * 4 + SUIT_INDEX[self.suit]
+
+    @staticmethod
+    def fromCode(code:int) -> "Card":
+        """
+        Returns the Card for an integer code. Cards are immutable, so the same shared Card object is returned for
+        every lookup of a code instead of allocating a new one.
+        """
+        return CARDS[code]
+
+
+# one shared Card per code, in Deck.construct() order
+CARDS = tuple(Card(suit, val) for val in range(2, 15) for suit in SUITS)
 
 
 # Testing Driver code
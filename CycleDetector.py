@@ -0,0 +1,48 @@
+"""
+Detects games that will never end.
+
+With the fixed pickup order most deals eventually repeat an earlier position forever, so without a round limit the
+game loop would never stop. Between rounds the whole game state is just the Players' hands (the table is empty), so
+once the hands repeat, the game is in a cycle.
+"""
+
+
+class CycleDetector(object):
+    """
+    Finds cycles in the sequence of between-round hand states with Brent's algorithm: it keeps a single saved state,
+    replaced at every power of 2 rounds, and compares each new state against it. Memory stays at one saved state no
+    matter how long the game runs, and a cycle of length L entered after R rounds is found within about R + 2L rounds.
+
+    Hands can hold card values or Card objects; pass cardValue (e.g. lambda card: card.val) for the latter. Suits are
+    ignored since they never affect play. Full states are only built when every hand size matches the saved state.
+    """
+    def __init__(self, hands:list, cardValue = None) -> None:
+        self.cardValue = cardValue
+        self.power = 1
+        self.lam = 1
+        self.save(hands)
+
+    def snapshot(self, hands:list) -> bytes:
+        # card values as bytes, with a 0 between hands (values are 2-14)
+        if self.cardValue is None:
+            return b"\0".join(bytes(hand) for hand in hands)
+        value = self.cardValue
+        return b"\0".join(bytes(value(card) for card in hand) for hand in hands)
+
+    def save(self, hands:list) -> None:
+        self.savedSizes = [len(hand) for hand in hands]
+        self.saved = self.snapshot(hands)
+
+    def check(self, hands:list) -> int:
+        """
+        Call once after every round with the Players' hands. Returns the cycle length once the hands repeat the
+        saved state, otherwise 0.
+        """
+        if [len(hand) for hand in hands] == self.savedSizes and self.snapshot(hands) == self.saved:
+            return self.lam
+        if self.lam == self.power:
+            self.save(hands)
+            self.power *= 2
+            self.lam = 0
+        self.lam += 1
+        return 0
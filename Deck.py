@@ -1,66 +1,136 @@
 from Card import Card
-from random import randint
+from array import array
+from random import Random
 from typing import Union
+import random
+
+
+def makeRng(seed:int = None, rng = None):
+    """
+    Picks the random number generator for a Deck or Game. An explicit rng (a random.Random or a NumPy Generator) is
+    used as is, a seed creates a new random.Random(seed), and with neither the global random module is used.
+    """
+    if rng is not None:
+        return rng
+    if seed is not None:
+        return Random(seed)
+    return random
+
+
+def bulkShuffle(num_decks:int, rng = None, size:int = 52):
+    """
+    Produces num_decks shuffled decks of Card codes at once, for batch simulation. With a NumPy Generator the result
+    is a (num_decks, size) uint8 array built with one vectorized call, otherwise it is a list of array('B') decks.
+    Each deck is an unbiased permutation, but they are not the same decks as num_decks calls to Deck.shuffle().
+    """
+    rng = makeRng(rng=rng)
+    if hasattr(rng, "permuted"):
+        import numpy as np  # only reachable when the caller already uses NumPy
+        return rng.permuted(np.tile(np.arange(size, dtype=np.uint8), (num_decks, 1)), axis=1)
+    decks = []
+    for deck in range(num_decks):
+        codes = array('B', range(size))
+        rng.shuffle(codes)
+        decks.append(codes)
+    return decks
+
 
 class Deck(object):
     """
-    Deck creates a collection of Card objects. Forms a standard 52 card deck with 4 suits, and 14 values.
+    Deck creates a collection of Card objects. Forms a standard 52 card deck with 4 suits, and 14 values, or a shoe of
+    several standard decks mixed together (decks=D gives 52*D cards).
     Constructs and shuffles the deck, allows user to draw() a single Card, or half the Deck.
+    Internally the deck is an array of one byte Card codes (see Card.code()), Cards are only looked up when drawn, so
+    even a shoe of hundreds of decks is a few KB. Every Card is the shared Card.fromCode() instance.
+    Shuffling uses rng if given (a random.Random or a NumPy Generator), or a new random.Random(seed) if a seed is given,
+    so the same seed always produces the same deck. With neither, the global random module is used.
+    With a random.Random (or the random module) the shuffle is lazy: drawSingle() picks each card as it is drawn, see
+    shuffle().
     """
-    def __init__(self) -> None:
-        self.card_list = []
+    def __init__(self, seed:int = None, rng = None, decks:int = 1) -> None:
+        if decks < 1:
+            raise ValueError("a Deck needs at least one standard deck, got decks={}".format(decks))
+        self.rng = makeRng(seed, rng)
+        self.decks = decks
+        self.codes = array('B')
+        # _randbelow is what Random.shuffle() draws with; randrange(n) draws the same numbers for the random module
+        self.randbelow = getattr(self.rng, "_randbelow", None) or getattr(self.rng, "randrange", None)
+        self.lazy = False  # True while the cards left in self.codes are still in construction order
         self.construct()
-        self.shuffle()
+        if self.randbelow is not None:
+            self.lazy = True
+        else:
+            self.shuffle()
     
     def construct(self) -> None:
         """
-        Builds a standard deck with 52 cards. 4 Suits (Clubs, Hearts, Diamonds, Spades). 
+        Builds a standard deck with 52 cards, decks times over. 4 Suits (Clubs, Hearts, Diamonds, Spades). 
         There are four Cards for each Value, one of each Suit. 
+        Card codes are numbered in construction order, so each constructed deck is simply codes 0 to 51.
         """
-        for val in range(2,15):
-            for suit in ["Clubs", "Hearts", "Diamonds", "Spades"]:
-                # create the respective Card object and add it to the list
-                self.card_list.append(Card(suit, val))
+        self.codes.extend(range(52))
+        if self.decks > 1:
+            self.codes *= self.decks
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def card_list(self) -> list:
+        # the Cards currently in the deck, bottom of the deck first
+        if self.lazy:
+            self.shuffle()
+        return [Card.fromCode(code) for code in self.codes]
 
     def clear(self) -> None:
         # clears the deck to reset state
-        self.card_list = []
+        self.codes = array('B')
+        self.lazy = False
     
     def shuffle(self)-> list:
         """
         Shuffles the deck of cards to generate a random permutation and returns that list of Cards. 
         Implements the Fisher-Yates Shuffling algorithm to shuffle in place; 
         generates unbiased permutations. Does this in O(n) time.
+        The rng's own shuffle() is the same Fisher-Yates loop without randint()'s per call overhead, and draws exactly
+        the random numbers the old randint() loop did, so a given seed produces the same deck as before.
+        A new Deck doesn't call this up front. Fisher-Yates fixes the top of the deck (the end of the list) first, so
+        drawSingle() can run one step of it per card drawn instead, drawing the same random numbers: a lazily drawn
+        Deck deals exactly the cards a shuffled one would, and drawing a few cards from a big shoe only costs those
+        few steps. Looking at the whole deck (card_list, splitDeck()) finishes the shuffle.
         """
-        for idx in range(len(self.card_list)-1, 0, -1):
-            # grab a random index to the left of the i (since reverse iteration)
-            randIdx = randint(0,idx)
-            self.card_list[idx], self.card_list[randIdx] = self.card_list[randIdx], self.card_list[idx]
+        self.rng.shuffle(self.codes)
+        self.lazy = False
         return self.card_list
 
     def drawSingle(self) -> Union[Card, bool]:
         """
         Pops top card off of the deck, and gives it to caller. This method can also be useful if there's custom rules regarding deck in the future. If empty deck, then return False.
         """
-        result = self.card_list.pop() if self.card_list else False
-        return result
+        codes = self.codes
+        if not codes:
+            return False
+        if self.lazy:
+            # one Fisher-Yates step: swap a random remaining card to the top. Random.shuffle() makes no draw for the
+            # last card, and neither does this
+            top = len(codes) - 1
+            if top:
+                pick = self.randbelow(top + 1)
+                codes[top], codes[pick] = codes[pick], codes[top]
+        return Card.fromCode(codes.pop())
     
     def splitDeck(self, num_split = 2) -> list:
         """
         Splits the card Deck by num_split times. Default split is in half (2), where each split is just half the deck.
         Returns as a list of Card lists, each Card list is one split. Cards are dealt on rotating basis to each split (player) to mimic actual dealing scenarios where deck number is not divisible by num_split.
+        Dealing from the top in rotation gives split k every num_split-th card starting k cards from the top, so each
+        split is one strided slice of the (reversed) deck. Empties the deck.
         """
-        # create list to hold all the card split lists
-        wrapperList = [[] for i in range(num_split)]
-        drawnCard = self.drawSingle()
-
-        while (drawnCard): # while there are still cards in the deck
-            for split in range(num_split):
-                if drawnCard: # if there's a valid card
-                    wrapperList[split].append(drawnCard)
-                drawnCard = self.drawSingle()
-
-        return wrapperList
+        if self.lazy:
+            self.shuffle()
+        fromTop = self.codes[::-1]
+        self.clear()
+        return [[Card.fromCode(code) for code in fromTop[split::num_split]] for split in range(num_split)]
 
             
 ########################################################################################################################
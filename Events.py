@@ -0,0 +1,241 @@
+"""
+Typed game events and the sinks that consume them.
+
+Game doesn't print anything itself anymore. It emits an event for every step of the game (deal, round start, turn,
+war, round won, player eliminated, game over) to a sink:
+  - NullSink discards everything. Game checks sink.enabled before building an event, so a game played with a
+    NullSink costs no more than one attribute check per step.
+  - TextSink renders the events as the familiar human readable game log, buffered and written in batches.
+  - JsonLinesSink writes one JSON object per event (one per line), also in batches.
+Anything with an emit(event) method, a flush() method and an enabled attribute can be used as a sink.
+
+Cards are Card objects in the events themselves; JsonLinesSink writes them as their integer codes (see Card.code()).
+"""
+
+from Card import Card
+import json
+import sys
+
+# event field types that are already JSON values, checked first since most fields are names, rounds and counts
+PLAIN_TYPES = (int, str, float, type(None))
+
+
+class Event(object):
+    """ Base class of all game events. kind names the event type in JSON output. """
+    kind = "event"
+    __slots__ = ()
+
+    def toDict(self) -> dict:
+        # the event's fields as JSON friendly values, with Cards written as their codes
+        fields = {"event": self.kind}
+        for name in self.__slots__:
+            fields[name] = toJson(getattr(self, name))
+        return fields
+
+
+class DealEvent(Event):
+    """
+    The cards have been dealt. hands is a list of (player name, list of Cards), custom is True for custom hands and
+    rules are the Rules the game is played by (None if unknown).
+    """
+    kind = "deal"
+    __slots__ = ("hands", "custom", "rules")
+
+    def __init__(self, hands:list, custom:bool = False, rules = None) -> None:
+        self.hands = hands
+        self.custom = custom
+        self.rules = rules
+
+
+class RoundStartEvent(Event):
+    """ A new Round is starting. handCounts is a list of (player name, number of cards) for the Players still in. """
+    kind = "round-start"
+    __slots__ = ("round", "handCounts")
+
+    def __init__(self, round:int, handCounts:list) -> None:
+        self.round = round
+        self.handCounts = handCounts
+
+
+class TurnEvent(Event):
+    """ Cards played in a Turn, as a list of (player name, Card) in the order they were played. """
+    kind = "turn"
+    __slots__ = ("round", "plays")
+
+    def __init__(self, round:int, plays:list) -> None:
+        self.round = round
+        self.plays = plays
+
+
+class WarEvent(Event):
+    """ A Turn was tied, so the Round continues as a War. ties counts the tied Turns so far in this Round. """
+    kind = "war"
+    __slots__ = ("round", "ties")
+
+    def __init__(self, round:int, ties:int) -> None:
+        self.round = round
+        self.ties = ties
+
+
+class RoundWonEvent(Event):
+    """ winner collected the cards on the table and now holds handCount cards. """
+    kind = "round-won"
+    __slots__ = ("round", "winner", "cards", "handCount")
+
+    def __init__(self, round:int, winner, cards:list, handCount:int) -> None:
+        self.round = round
+        self.winner = winner
+        self.cards = cards
+        self.handCount = handCount
+
+
+class PlayerEliminatedEvent(Event):
+    """ A Player had to play a card but had none left, and is out of the game. """
+    kind = "player-eliminated"
+    __slots__ = ("round", "player")
+
+    def __init__(self, round:int, player) -> None:
+        self.round = round
+        self.player = player
+
+
+class GameOverEvent(Event):
+    """
+    The game has ended, result is its GameResult. cached is True if the result came from an OutcomeCache instead
+    of being played out.
+    """
+    kind = "game-over"
+    __slots__ = ("result", "cached")
+
+    def __init__(self, result, cached:bool = False) -> None:
+        self.result = result
+        self.cached = cached
+
+
+def toJson(value):
+    # converts event field values (Cards, GameResults, tuples) into JSON friendly values
+    if isinstance(value, PLAIN_TYPES):
+        return value
+    if isinstance(value, Card) or hasattr(value, "code"):
+        return value.code()
+    if isinstance(value, (list, tuple)):
+        return [toJson(item) for item in value]
+    if hasattr(value, "__slots__") and not isinstance(value, Event):
+        return {name: getattr(value, name) for name in value.__slots__}
+    return value
+
+
+class NullSink(object):
+    """ Sink that discards every event. """
+    enabled = False
+
+    def emit(self, event:Event) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+
+class TextSink(object):
+    """
+    Renders events as the human readable game log, the same text Game used to print. Lines are buffered and written
+    to stream (stdout by default) every batch_size events, and whenever a game ends.
+    """
+    enabled = True
+
+    def __init__(self, stream = None, batch_size:int = 256) -> None:
+        self.stream = stream
+        self.batch_size = batch_size
+        self.pending = []
+        self.events = 0
+
+    def emit(self, event:Event) -> None:
+        self.pending.extend(self.render(event))
+        self.events += 1
+        if self.events >= self.batch_size or isinstance(event, GameOverEvent):
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            stream = self.stream if self.stream is not None else sys.stdout
+            stream.write("\n".join(self.pending) + "\n")
+            stream.flush()
+        self.pending = []
+        self.events = 0
+
+    def render(self, event:Event) -> list:
+        """ Returns the lines of text for an event (each line is written followed by a newline). """
+        if isinstance(event, TurnEvent):
+            return ["  Player {} plays {}".format(name, card.show()) for name, card in event.plays]
+        if isinstance(event, RoundStartEvent):
+            lines = ["Beginning of Round {}".format(event.round)]
+            lines.extend("  Player {} has {} cards".format(name, count) for name, count in event.handCounts)
+            lines.append("\n  Playing cards... \n")
+            return lines
+        if isinstance(event, RoundWonEvent):
+            return ["\n  Round {} winner is Player {}".format(event.round, event.winner),
+                    "  They collect the cards on the table and now have {} cards in their hand.\n\n".format(event.handCount)]
+        if isinstance(event, WarEvent):
+            return ["\tTie has occurred, War!", "\n\tKeep playing... \n"]
+        if isinstance(event, PlayerEliminatedEvent):
+            return ["\n  Player {} is out of cards and has LOST!\n".format(event.player)]
+        if isinstance(event, DealEvent):
+            return self.renderDeal(event)
+        if isinstance(event, GameOverEvent):
+            return self.renderGameOver(event)
+        return []
+
+    def renderDeal(self, event:DealEvent) -> list:
+        if not event.custom:
+            lines = ["Created deck and splitting it amongst {} players...".format(len(event.hands))]
+            lines.extend("Player {} now has {} cards.".format(name, len(cards)) for name, cards in event.hands)
+            lines.append("\n")
+            return lines
+        lines = ["Dealing custom test cards"]
+        for name, cards in event.hands:
+            lines.append("Player {} has {} cards and starts with:".format(name, len(cards)))
+            lines.append("Player {}'s hand: ".format(name))
+            lines.extend(card.show() for card in cards)
+            lines.append("\n\n")
+        return lines
+
+    def renderGameOver(self, event:GameOverEvent) -> list:
+        result = event.result
+        if event.cached:
+            lines = ["Found this deal in the outcome cache, skipping to the end."]
+        elif result.cycleLength:
+            lines = ["  The hands have started repeating every {} rounds, stopping the game.\n".format(result.cycleLength)]
+        else:
+            lines = []
+        if result.winner is not None:
+            lines.extend(["\nEND OF GAME\n", "  Winner: Player {}\n".format(result.winner)])
+        elif result.cycleLength:
+            lines.extend(["\nEND OF GAME\n", "  Draw: the hands repeat every {} rounds\n".format(result.cycleLength)])
+        else:
+            return lines  # stopped by the round limit, there is no end game message
+        lines.append("  Total number of rounds played: {}\n".format(result.rounds))
+        return lines
+
+
+class JsonLinesSink(object):
+    """
+    Writes every event as one line of JSON to stream, batching batch_size events per write. Also flushes whenever a
+    game ends, so a finished game is always fully written.
+    """
+    enabled = True
+
+    def __init__(self, stream, batch_size:int = 1024) -> None:
+        self.stream = stream
+        self.batch_size = batch_size
+        self.pending = []
+
+    def emit(self, event:Event) -> None:
+        self.pending.append(json.dumps(event.toDict(), separators=(",", ":")))
+        if len(self.pending) >= self.batch_size or isinstance(event, GameOverEvent):
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            self.stream.write("\n".join(self.pending) + "\n")
+            self.stream.flush()
+        self.pending = []
@@ -0,0 +1,306 @@
+"""
+Explores every deal of a small deck.
+
+The rules are deterministic, so a deal decides the whole game, and with a reduced deck (a few ranks, up to 4 suits
+each) there are few enough deals to play all of them. Suits never affect play, so deals are the distinct orders of the
+deck's card values: 70 for 2 ranks of 4 suits, 34,650 for 3 ranks, 63,063,000 for 4 ranks. Larger decks are sampled
+instead.
+
+Games are played one round at a time, and the outcome of every between-round position (the two hands, as card values)
+is memoized in a hash table shared by all the deals an Explorer plays. A game stops as soon as it reaches a position
+whose outcome is already known, and every position it passed through is filled in on the way back, so subgames that
+many deals run into are only played once. Since the deck is small, every game either ends or repeats a position: a
+game that repeats is a draw, and its GameResult counts the rounds until the first repeated position, with cycleLength
+the period of the repetition. Finished games give exactly the same GameResult as Simulator. Cycles grow long quickly
+with the deck size (tens of thousands of rounds with 5 ranks of 4 suits, where sampled deals rarely meet), so the
+table is emptied whenever it holds more than max_states positions.
+
+explore() shards the deals by their first few cards across a process pool, like Tournament does with seeds. Every
+worker process keeps its own memo table for all the shards it plays, and sends back only ExplorerStats: the win
+probabilities, the distribution of game lengths and cycle lengths, and (optionally) every deal that cycles.
+
+Usage: python3 Explorer.py --ranks 3 --suits 4   (or --samples 100000 --ranks 5 for a sample)
+"""
+
+from GameResult import GameResult
+from Tournament import TournamentStats
+from collections import Counter, deque
+from math import factorial
+from multiprocessing import Pool, cpu_count
+from random import Random
+import argparse
+
+
+def deckValues(ranks:int = 3, suits:int = 4) -> list:
+    """ Card values of a reduced deck: the lowest ranks values (starting at 2), suits cards of each. """
+    if not 1 <= ranks <= 13 or not 1 <= suits <= 4:
+        raise ValueError("a deck has 1 to 13 ranks and 1 to 4 suits")
+    return [value for value in range(2, 2 + ranks) for suit in range(suits)]
+
+
+def countDeals(ranks:int = 3, suits:int = 4) -> int:
+    """ Number of distinct deals (distinct orders of the card values) of the reduced deck. """
+    return factorial(ranks * suits) // factorial(suits) ** ranks
+
+
+def distinctOrders(counts:dict, length:int = None, prefix:tuple = ()):
+    """
+    Generator of every distinct order of a multiset of card values (value -> count), as tuples in lexicographic order,
+    each one appended to prefix. With length, yields orders of only that many cards (the prefixes of the full orders).
+    """
+    remaining = sum(counts.values()) if length is None else length
+    if not remaining:
+        yield prefix
+        return
+    for value in sorted(counts):
+        if counts[value]:
+            counts[value] -= 1
+            yield from distinctOrders(counts, remaining - 1, prefix + (value,))
+            counts[value] += 1
+
+
+def splitOrder(order:tuple) -> tuple:
+    # the deck is dealt from the top in rotation, like Deck.splitDeck()
+    return order[0::2], order[1::2]
+
+
+class ExplorerStats(TournamentStats):
+    """
+    TournamentStats for explored deals, plus the distribution of cycle lengths among the draws and, with keep_cycles,
+    every cycling deal (as its order of card values). total is the number of distinct deals of the deck, so a run that
+    has explored all of them is exhaustive and its rates are exact probabilities.
+    """
+    def __init__(self, total:int = 0, keep_cycles:bool = True) -> None:
+        super().__init__()
+        self.total = total
+        self.keep_cycles = keep_cycles
+        self.cycleLengths = Counter()  # cycle length -> number of deals
+        self.cyclingDeals = []
+        self.roundsPlayed = 0  # rounds actually played, the rest of the rounds counted came from the memo table
+
+    def addDeal(self, order:tuple, result:GameResult) -> None:
+        self.add(result)
+        if result.cycleLength:
+            self.cycleLengths[result.cycleLength] += 1
+            if self.keep_cycles:
+                self.cyclingDeals.append(order)
+
+    def merge(self, other:"ExplorerStats") -> "ExplorerStats":
+        super().merge(other)
+        self.cycleLengths.update(other.cycleLengths)
+        self.cyclingDeals.extend(other.cyclingDeals)
+        self.roundsPlayed += other.roundsPlayed
+        return self
+
+    def exhaustive(self) -> bool:
+        return self.games == self.total
+
+    def lengthQuantile(self, fraction:float) -> int:
+        # the smallest number of rounds that at least fraction of the games took no more than
+        seen = 0
+        for rounds, count in sorted(self.roundCounts.items()):
+            seen += count
+            if seen >= fraction * self.games:
+                return rounds
+        return 0
+
+    def report(self) -> str:
+        lines = ["Deals explored: {:,} of {:,} ({})".format(self.games, self.total, "all" if self.exhaustive() else "sampled")]
+        for seat, rate in enumerate(self.winRates()):
+            lines.append("  Player {} win probability: {:.4f}".format(seat, rate))
+        lines.append("  Draws (cycling deals): {:,} ({:.4f})".format(self.draws, self.draws / self.games if self.games else 0.0))
+        lines.append("  Mean rounds per game: {:.1f}".format(self.meanRounds()))
+        lines.append("  Rounds per game: median {}, 90% {}, 99% {}, longest {}".format(
+            self.lengthQuantile(0.5), self.lengthQuantile(0.9), self.lengthQuantile(0.99), max(self.roundCounts, default=0)))
+        if self.cycleLengths:
+            lines.append("  Cycle lengths: {} different, most common {}".format(
+                len(self.cycleLengths), ", ".join("{} ({:,} deals)".format(*item) for item in self.cycleLengths.most_common(3))))
+        counted = sum(rounds * count for rounds, count in self.roundCounts.items())
+        lines.append("  Rounds played: {:,} of {:,} ({:,} looked up)".format(self.roundsPlayed, counted, counted - self.roundsPlayed))
+        return "\n".join(lines)
+
+
+class Explorer(object):
+    """
+    Plays 2 player games by Simulator's rules, memoizing the outcome of every position it passes through. outcome()
+    plays one deal; the memo table (memo, position -> result) grows with every deal played and is what makes playing
+    all the deals of a deck affordable. It is emptied once it holds more than max_states positions.
+    """
+    def __init__(self, max_states:int = 2000000) -> None:
+        self.max_states = max_states
+        self.memo = {}
+        self.roundsPlayed = 0
+
+    def outcome(self, p1cards, p2cards) -> GameResult:
+        """ The GameResult of the game from the given hands (card values, top of the hand first). """
+        memo = self.memo
+        hand0 = deque(p1cards)
+        hand1 = deque(p2cards)
+        path = []     # [position, ties] of every round played, in order
+        onPath = {}   # position -> its index in path
+        end = None    # result of the position the path ends in, as (winner, rounds, wars, longestWar, cycleLength)
+        while end is None:
+            if not hand0 or not hand1:
+                end = (0 if hand0 else 1, 0, 0, 0, 0)
+                break
+            position = bytes(hand0) + b"\0" + bytes(hand1)
+            end = memo.get(position)
+            if end is not None:
+                break
+            start = onPath.get(position)
+            if start is not None:
+                # the game repeats the position it reached start rounds in: a draw. Every position on the cycle
+                # takes one full period to repeat
+                cycle = path[start:]
+                length = len(cycle)
+                wars = sum(1 for position, ties in cycle if ties)
+                longestWar = max(ties for position, ties in cycle)
+                for position, ties in cycle:
+                    memo[position] = (None, length, wars, longestWar, length)
+                end = memo[path[start][0]]
+                del path[start:]
+                break
+            onPath[position] = len(path)
+            ties, winner = self.playRound(hand0, hand1)
+            path.append((position, ties))
+            if winner is not None:
+                # ran out of cards in the middle of a War: the round the path ends with is the last one
+                end = (winner, 0, 0, 0, 0)
+
+        self.roundsPlayed += len(onPath)
+        # fill in the positions played on the way back, each one round further from the end
+        winner, rounds, wars, longestWar, cycleLength = end
+        for position, ties in reversed(path):
+            rounds += 1
+            if ties:
+                wars += 1
+                if ties > longestWar:
+                    longestWar = ties
+            memo[position] = (winner, rounds, wars, longestWar, cycleLength)
+        if len(memo) > self.max_states:
+            memo.clear()
+        return GameResult(winner, rounds, wars, longestWar, cycleLength)
+
+    @staticmethod
+    def playRound(hand0:deque, hand1:deque) -> tuple:
+        """
+        Plays one round, like Simulator.playOut(). Returns (tie turns, winner), winner being set only when a player
+        ran out of cards in the middle of a War.
+        """
+        card0 = hand0.popleft()
+        card1 = hand1.popleft()
+        if card0 > card1:
+            hand0.append(card1)
+            hand0.append(card0)
+            return 0, None
+        if card1 > card0:
+            hand1.append(card1)
+            hand1.append(card0)
+            return 0, None
+        tableCards = [card0, card1]
+        ties = 0
+        while card0 == card1:
+            ties += 1
+            if not hand0:
+                return ties, 1
+            card0 = hand0.popleft()
+            if not hand1:
+                return ties, 0
+            card1 = hand1.popleft()
+            tableCards.append(card0)
+            tableCards.append(card1)
+        tableCards.reverse()
+        if card0 > card1:
+            hand0.extend(tableCards)
+        else:
+            hand1.extend(tableCards)
+        return ties, None
+
+    def exploreOrders(self, orders, stats:ExplorerStats) -> ExplorerStats:
+        """ Plays every deal (order of card values) in orders into stats, and returns stats. """
+        for order in orders:
+            stats.addDeal(order, self.outcome(*splitOrder(order)))
+        return stats
+
+
+# each worker process keeps one Explorer, so its memo table is shared by all the shards it plays
+workerExplorer = None
+
+
+def exploreShard(args:tuple) -> ExplorerStats:
+    """ Worker entry point: plays every deal that starts with prefix, or num_samples random deals from seed. """
+    global workerExplorer
+    ranks, suits, prefix, num_samples, seed, keep_cycles = args
+    if workerExplorer is None:
+        workerExplorer = Explorer()
+    values = deckValues(ranks, suits)
+    stats = ExplorerStats(countDeals(ranks, suits), keep_cycles)
+    if num_samples is None:
+        counts = Counter(values)
+        counts.subtract(prefix)
+        orders = distinctOrders(counts, prefix=tuple(prefix))
+    else:
+        orders = sampleOrders(values, num_samples, Random(seed))
+    before = workerExplorer.roundsPlayed
+    workerExplorer.exploreOrders(orders, stats)
+    stats.roundsPlayed = workerExplorer.roundsPlayed - before
+    return stats
+
+
+def sampleOrders(values:list, num_samples:int, rng:Random):
+    """ Generator of num_samples uniformly random deck orders. """
+    for sample in range(num_samples):
+        order = list(values)
+        rng.shuffle(order)
+        yield tuple(order)
+
+
+def shardPrefixes(ranks:int, suits:int, min_shards:int) -> list:
+    """ The shortest deal prefixes that split the deals into at least min_shards shards (or single cards, if fewer). """
+    values = deckValues(ranks, suits)
+    for length in range(1, len(values) + 1):
+        prefixes = list(distinctOrders(Counter(values), length))
+        if len(prefixes) >= min_shards:
+            return prefixes
+    return prefixes
+
+
+def explore(ranks:int = 3, suits:int = 4, num_workers:int = None, num_samples:int = None, seed:int = 0, keep_cycles:bool = True) -> ExplorerStats:
+    """
+    Plays every deal of a deck of ranks x suits cards, or num_samples random deals of it (seeded by seed), across a
+    pool of num_workers processes (defaults to every core), and returns the merged ExplorerStats.
+    """
+    num_workers = num_workers or cpu_count()
+    if num_samples is None:
+        shards = [(ranks, suits, prefix, None, None, keep_cycles) for prefix in shardPrefixes(ranks, suits, num_workers * 8)]
+    else:
+        base, extra = divmod(num_samples, num_workers)
+        master = Random(seed)
+        shards = [(ranks, suits, (), base + (1 if idx < extra else 0), master.getrandbits(64), keep_cycles)
+                  for idx in range(num_workers)]
+    stats = ExplorerStats(countDeals(ranks, suits), keep_cycles)
+    if num_workers == 1:
+        for shard in shards:
+            stats.merge(exploreShard(shard))
+        return stats
+    with Pool(num_workers) as pool:
+        for shardStats in pool.imap_unordered(exploreShard, shards):
+            stats.merge(shardStats)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play every deal of a small War deck, or a sample of them.")
+    parser.add_argument("--ranks", type=int, default=3, help="card ranks in the deck, starting from 2")
+    parser.add_argument("--suits", type=int, default=4, help="cards of each rank (1 to 4)")
+    parser.add_argument("--samples", type=int, default=None, help="play this many random deals instead of all of them")
+    parser.add_argument("--seed", type=int, default=0, help="seed for --samples")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--list-cycles", action="store_true", help="print every deal that cycles")
+    args = parser.parse_args()
+
+    stats = explore(args.ranks, args.suits, args.workers, args.samples, args.seed, args.list_cycles)
+    print(stats.report())
+    for order in sorted(stats.cyclingDeals):
+        p1cards, p2cards = splitOrder(order)
+        print(" ".join(map(str, p1cards)), "|", " ".join(map(str, p2cards)))
@@ -35,10 +35,20 @@ Definitions of terms:
 """
 
 from Card import Card
+from CycleDetector import CycleDetector
 from Deck import Deck
+from Events import DealEvent, GameOverEvent, PlayerEliminatedEvent, RoundStartEvent, RoundWonEvent, TextSink, TurnEvent, WarEvent
+from GameResult import GameResult
+from OutcomeCache import OutcomeCache, handKey
 from Player import Player
+from Profiler import Profiler
+from Rules import PICKUPS, Rules
+from operator import attrgetter
 from typing import Union
+import argparse
 import math
+import random
+import sys
 
 
 # construct the Game class
@@ -47,44 +57,94 @@ class Game(object):
   Each Game has one Deck, num_players Players. Game should keep track of who's turn it is to play a Card, and if someone has won. It should also keep track of number of turns played and who won.
 
   The run() method drives the Game interaction and calls upon playTurn() to play each turn, determining which Player wins the turn and gets the tableCards. checkWin() is used in run() to check if a Player has won the Game, at which point the endGameMessage() stats are displayed.
+  run() returns the GameResult instead of exiting, and reset() prepares the same Game object (and its Players) for another game, so one Game can play any number of games in a loop.
+  For finer control, start() deals, playRound() plays a single round, and finish() ends the game.
   """
-  def __init__(self, num_players:int = 2) -> None:
+  def __init__(self, num_players:int = 2, seed:int = None, rng = None, cache:OutcomeCache = None, sink = None, decks:int = 1, rules:Rules = None) -> None:
       self.num_players = num_players
-      self.players = [Player(i) for i in range(num_players)] # initialize each Player with idx+1 as name
+      self.decks = decks       # number of standard decks in the shoe that is dealt
+      self.rules = rules if rules is not None else Rules()  # rule variant, applied by start() (see Rules)
+      # every deal comes from a 64 bit seed (drawn from the global random module if not given), so any game can be
+      # replayed with Game(seed=g.seed). An explicit rng (random.Random or NumPy Generator) is used instead if given
+      self.rng = rng
+      self.seed = None if rng is not None else (seed if seed is not None else random.getrandbits(64))
+      self.seats = [Player(i) for i in range(num_players)] # initialize each Player with idx+1 as name, kept for reset()
+      self.players = list(self.seats)
       self.rounds = 0
       self.tableCards = []     # all the cards that are on the table, to be collected by a Player
       self.tie = False         # detects if there is a tie situation (War)
       self.roundWinner = None  # the winner of a single "round" not to be confused with ...
       self.winner = None       # the winner of the whole game
       self.losers = []         # if a player loses all their cards, they are moved here, and removed from self.players
-      self.deckSize = 12
-
+      self.deckSize = 52 * decks  # total cards in play, a Player holding all of them has won
+      self.wars = 0            # number of rounds that needed a War to resolve
+      self.longestWar = 0      # most ties in a single round
+      self.roundTies = 0       # ties so far in the current round
+      self.cache = cache       # optional OutcomeCache, looked up with the starting hands before playing
+      self.cacheKey = None
+      self.cycleLength = 0     # set if the game was stopped as a draw because its hands started repeating
+      self.cached = False      # set if the result came from the cache instead of being played out
+      # everything that happens in the game is emitted as an event to the sink (see Events), by default printed as
+      # text. Events are only built when sink.enabled, so a NullSink makes the game silent at almost no cost
+      self.sink = sink if sink is not None else TextSink()
+      self.verbose = self.sink.enabled
+      self.round_limit = math.inf
+      self.detector = None     # CycleDetector when cycle detection is on
+      self.over = False        # set once the game has ended
+
+  def reset(self, seed:int = None) -> None:
+    """
+    Prepares this Game for a new game with the same settings, reusing the Player objects and the table instead of
+    allocating new ones. The next deal uses seed, or a fresh 64 bit seed if none is given (an explicit rng just keeps
+    drawing from where it is).
+    """
+    for p in self.seats:
+      p.hand.clear()
+    self.players[:] = self.seats
+    self.losers.clear()
+    self.tableCards.clear()
+    if self.rng is None:
+      self.seed = seed if seed is not None else random.getrandbits(64)
+    self.rounds = 0
+    self.tie = False
+    self.roundWinner = None
+    self.winner = None
+    self.wars = 0
+    self.longestWar = 0
+    self.roundTies = 0
+    self.cacheKey = None
+    self.cycleLength = 0
+    self.cached = False
+    self.detector = None
+    self.over = False
 
   def roundsPlayed(self) -> int:
     """ End of a round is defined as when a Player collects the tableCards (one war scenario counts as one round)"""
     return self.rounds
 
-  def endGameMessage(self) -> None:
+  def result(self) -> GameResult:
+    """ Returns the outcome of the game so far as a GameResult, counting a War still in progress. """
+    winner = self.winner.name if self.winner else None
+    wars = self.wars + (1 if self.roundTies else 0)
+    return GameResult(winner, self.rounds, wars, max(self.longestWar, self.roundTies), self.cycleLength)
+
+  def endGameMessage(self) -> GameResult:
     """
-    Prints the end game message with stats such as number of turns played, which Player won, which Player(s) lost.
-    Then exits with code 0. Exiting here prevents edge cases from manifesting in nasty bugs (infinite loops)
+    Emits the game over event with stats such as number of turns played, which Player won (or the cycle length of a drawn game).
+    Marks the game as over, so the game loop stops here; this used to exit() to prevent edge cases from manifesting in nasty bugs (infinite loops)
+    A finished game is stored in the OutcomeCache first, if there is one. Returns the GameResult.
     """
-    # ensure winner is actually a Player
-    if self.winner:
-      print("\nEND OF GAME\n")
-      print("  Winner: Player {}\n".format(self.winner.name))
-    else:
-      #incorrect end condition, exit with error status 2
-      exit(2)
-    # print("  Players that lost: ")
-    # for player in self.losers:
-    #   print("    Player {}".format(player.name))
-    print("  Total number of rounds played: {}\n".format(self.rounds))
-    exit(0)  # need to terminate game here to prevent edge cases
+    self.over = True
+    result = self.result()
+    if self.cache is not None and self.cacheKey is not None and (self.winner or self.cycleLength):
+      self.cache.put(self.cacheKey, result)
+    # the sink always gets the game over event, even without a verbose sink, so it can flush what it buffered
+    self.sink.emit(GameOverEvent(result, self.cached))
+    return result
 
   def checkWin(self) -> bool:
     """
-    Checks each Player's hand count to see if they have won (52 cards in their hand). If win, set
+    Checks each Player's hand count to see if they have won (all deckSize cards in their hand). If win, set
     self.winner to the Player and return true, else return false.
     """
     if len(self.players) == 1:
@@ -101,34 +161,37 @@ class Game(object):
     This method creates a Deck which is shuffled, then splits it evenly to each player. Optionally, omit in driver code to run smaller, custom test cases.
     """
     # create the deck and dish it out
-    deck = Deck()
-    self.deckSize = 52     
-    print("Created deck and splitting it amongst {} players...".format(len(self.players)))
+    deck = Deck(seed=self.seed, rng=self.rng, decks=self.decks)
+    self.deckSize = len(deck)
     splitDeck = deck.splitDeck(len(self.players))
     for idx in range(len(self.players)):
       self.players[idx].collectCards(splitDeck[idx], reverse=False)
-      print("Player {} now has {} cards.".format(self.players[idx].name, str(self.players[idx].handCount())))
-    print("\n")
+    if self.verbose:
+      self.sink.emit(DealEvent([(p.name, list(p.hand)) for p in self.players], rules=self.rules))
 
   def playTurn(self) -> tuple:
     """
     Method to play out a "turn", where a turn is defined as where each player plays only one card. This is in contrast to a "round" which can consist of one or more turns. In a turn, each player plays one card to the table. If their card is of greater value than the prior cards already in turnCards, then they're called the "roundWinner"
     """
     turnCards = []      # the set of cards played in a "turn" (ignores any previous cards that may be on table)
+    plays = []          # (player name, card) for the turn event
     for p in self.players: # players still in the game (losers have been removed and put in self.losers)
       played_card = p.playCard()
       
       if not played_card:
         # if p has no more cards to play, then remove from players, edge case, may not be used
-        print("\n  Player {} is out of cards and has LOST!\n".format(p.name))
-        self.players.remove(p)
-        self.losers.append(p)
-        if self.num_players - len(self.losers) == 1:
-          self.winner = self.players.pop()
-          self.endGameMessage()
+        if self.verbose:
+          # report the cards played before p ran out first, to keep the events in order
+          if plays:
+            self.sink.emit(TurnEvent(self.rounds, plays))
+            plays = []
+          self.sink.emit(PlayerEliminatedEvent(self.rounds, p.name))
+        if self.eliminate(p):
+          return (self.winner, turnCards)
             
       else: # p plays the card
-        print("  Player {} plays ".format(p.name) + played_card.show())
+        if self.verbose:
+          plays.append((p.name, played_card))
         # check to see if played_card beats other cards on turnCards
         maxVal = 0  
         # find the maxVal in turnCards
@@ -141,6 +204,8 @@ class Game(object):
         # by here maxVal = 0 (meaning no prev card played) or is the max card val played
         if maxVal < played_card.val:
           self.roundWinner = p
+    if plays:
+      self.sink.emit(TurnEvent(self.rounds, plays))
     #end of turn checks
     if len(self.players) > 1 and turnCards:
       # more than one player left, check for ties
@@ -156,85 +221,189 @@ class Game(object):
     else:
       return (self.roundWinner, turnCards)
 
-  def play(self, round_limit:int = math.inf, custom_test:bool = False, p1cards:list = None, p2cards:list = None) -> None:
+  def eliminate(self, p:Player) -> bool:
+    """ Moves p, who has run out of cards, to the losers. Returns True if that ended the game. """
+    self.players.remove(p)
+    self.losers.append(p)
+    if self.num_players - len(self.losers) == 1:
+      self.winner = self.players.pop()
+      self.endGameMessage()
+      return True
+    return False
+
+  def playWarTurn(self) -> tuple:
+    """ Plays a turn of a War. By default just another turn; Rules variants with face down cards replace it. """
+    return self.playTurn()
+
+  def collectTable(self, winner:Player) -> None:
+    """ The round winner picks up the table, most recently played card first (Rules variants replace this). """
+    winner.collectCards(self.tableCards)
+
+  def start(self, hands:list = None, round_limit:int = math.inf, detect_cycles:bool = False) -> None:
     """
-    Main game loop that drives the game, prompts turns/plays, and determines if a player has won.
-    Input parameters: 
-    - round_limit: number of rounds to play, defaults to inf 
-    - custom_test: boolean flag to determine if there are custom hand inputs
-    - p1cards and p2cards: list of Cards, the custom hand inputs for p1 and p2
+    Deals the cards (or hands out the given hands, a list of Card lists one per Player) and gets ready to play.
+    If the deal is found in the OutcomeCache, the game ends right away with the cached result.
     """
-
-    # check if there's a custom_test flag set, indicating want to have custom player hands    
-    if custom_test:  
-      print("Dealing custom test cards")
-      self.players[0].collectCards(p1cards, reverse=False)
-      self.players[1].collectCards(p2cards, reverse=False)
-      self.deckSize = len(p1cards) + len(p2cards)
-
-      print("Player 0 has {} cards and starts with:".format(str(self.players[0].handCount())))
-      print(self.players[0].displayHand())
-      print("\n\n")
-      print("Player 1 has {} cards and starts with:".format(str(self.players[1].handCount())))
-      print(self.players[1].displayHand())
-      print("")
-      print("\n\n")
+    if not self.players:
+      # with nobody to play a card, no turn ever produces a round winner
+      raise ValueError("a game needs at least one player")
+    self.round_limit = round_limit
+    if hands is not None:
+      for p, cards in zip(self.players, hands):
+        p.collectCards(cards, reverse=False)
+      self.deckSize = sum(len(cards) for cards in hands)
+      if self.verbose:
+        self.sink.emit(DealEvent([(p.name, list(p.hand)) for p in self.players], custom=True, rules=self.rules))
     else:
       self.dealCards()
+    # swaps in the implementations of any rule variants, nothing is checked per round
+    self.rules.apply(self)
+
+    # outcomes under other rules aren't the deal's cached outcome
+    if self.cache is not None and self.rules.isDefault():
+      # the starting hands decide the whole game, so a deal seen before can skip straight to the end
+      self.cacheKey = handKey([[card.val for card in p.hand] for p in self.players])
+      cached = self.cache.get(self.cacheKey)
+      if cached is not None and cached.rounds <= round_limit and (cached.winner is not None or detect_cycles):
+        self.cached = True
+        self.winner = self.seats[cached.winner] if cached.winner is not None else None
+        self.rounds = cached.rounds
+        self.wars = cached.wars
+        self.longestWar = cached.longestWar
+        self.cycleLength = cached.cycleLength
+        self.cacheKey = None  # already cached
+        self.endGameMessage()
+        return
+
+    # with random pickup a repeated position doesn't mean the game repeats, so there are no cycles to detect
+    if detect_cycles and self.rules.deterministic():
+      self.detector = CycleDetector([p.hand for p in self.players], attrgetter("val"))
+    else:
+      self.detector = None
 
+  def playRound(self) -> bool:
+    """
+    Plays one round, and returns whether the game is still going. Ends the game (see finish()) once someone has
+    won, the round limit is reached or the hands start repeating.
+    """
+    if self.over:
+      return False
     # checkWin() used to check if there is a winner, if no winner, then play another round
-    while not self.checkWin() and self.rounds < round_limit: 
-      self.rounds += 1
+    if self.checkWin() or self.rounds >= self.round_limit:
+      self.endGameMessage()
+      return False
+    self.rounds += 1
+    if self.verbose:
+      self.sink.emit(RoundStartEvent(self.rounds, [(p.name, p.handCount()) for p in self.players]))
+    
+    rWinner, turnCards = self.playTurn()
+    self.tableCards.extend(turnCards)  # add cards from turn to tableCards
+    while not self.over and (self.tie or (not rWinner)):
+      self.roundTies += 1
+      if self.verbose:
+        self.sink.emit(WarEvent(self.rounds, self.roundTies))
+      rWinner, turnCards = self.playWarTurn()
+      self.tableCards.extend(turnCards)
+    if self.over:
+      # a Player ran out of cards during the War and the game has ended
+      return False
+    # give the roundWinner the tableCards
+    self.collectTable(rWinner)
+    if self.verbose:
+      self.sink.emit(RoundWonEvent(self.rounds, rWinner.name, list(self.tableCards), rWinner.handCount()))
+    # reset 
+    if self.roundTies:
+      self.wars += 1
+      self.longestWar = max(self.longestWar, self.roundTies)
+      self.roundTies = 0
+    self.tableCards.clear()
+    self.tie = False
+    self.roundWinner = None
+    if self.detector is not None:
+      self.cycleLength = self.detector.check([p.hand for p in self.players])
+      if self.cycleLength:
+        self.endGameMessage()
+        return False
+    return True
+
+  def finish(self) -> GameResult:
+    """ Ends the game if it hasn't ended yet, and returns its GameResult. """
+    if not self.over:
+      self.endGameMessage()
+    return self.result()
+
+  def run(self, round_limit:int = math.inf, hands:list = None, detect_cycles:bool = False) -> GameResult:
+    """
+    Plays a whole game and returns its GameResult. Input parameters:
+    - round_limit: number of rounds to play, defaults to inf (a game stopped by it has winner None)
+    - hands: optional list of Card lists, custom starting hands for each Player instead of dealing a Deck
+    - detect_cycles: stop the game as a draw once the hands start repeating (see CycleDetector), instead of
+      playing a looping deal until round_limit
+    Call reset() before running the same Game again.
+    """
+    self.start(hands, round_limit, detect_cycles)
+    while self.playRound():
+      pass
+    return self.finish()
 
-      print("Beginning of Round {}".format(self.rounds))
-      for p in self.players:
-        print("  Player {} has {} cards".format(p.name, p.handCount()))
-      print("\n  Playing cards... \n")
-      
-      rWinner, turnCards = self.playTurn()
-      self.tableCards = self.tableCards + turnCards  # add cards from turn to tableCards
-      while self.tie or (not rWinner):
-        print("\tTie has occurred, War!")
-        # for p in self.players:
-        #   print("  Player {} has {} cards".format(p.name, p.handCount()))
-        print("\n\tKeep playing... \n")
-        rWinner, turnCards = self.playTurn()
-        self.tableCards = self.tableCards + turnCards
-      # give the roundWinner the tableCards
-      rWinner.collectCards(self.tableCards) 
-      print("\n  Round {} winner is Player {}".format(self.rounds, rWinner.name))
-      print("  They collect the cards on the table and now have {} cards in their hand.\n\n".format(rWinner.handCount()))
-      # reset 
-      self.tableCards = []
-      self.tie = False
-      self.roundWinner = None
-    # end of game
-    self.endGameMessage()
+  def play(self, round_limit:int = math.inf, custom_test:bool = False, p1cards:list = None, p2cards:list = None, detect_cycles:bool = False) -> GameResult:
+    """
+    Main game loop that drives the game, prompts turns/plays, and determines if a player has won.
+    Input parameters: 
+    - round_limit: number of rounds to play, defaults to inf 
+    - custom_test: boolean flag to determine if there are custom hand inputs
+    - p1cards and p2cards: list of Cards, the custom hand inputs for p1 and p2
+    - detect_cycles: stop the game as a draw once the hands start repeating (see CycleDetector), instead of
+      playing a looping deal until round_limit
+    Same as run(), kept for the custom_test style of passing hands.
+    """
+    hands = [p1cards, p2cards] if custom_test else None
+    return self.run(round_limit, hands, detect_cycles)
         
 
 
 ## driver code, tests
 
-g = Game(num_players=2)
-
-# TEST CASE 1: testing that game properly handles War tie scenario, and properly terminates at end
-# p1cards = [Card("Clubs", 14), Card("Hearts", 14), Card("Spades", 14), Card("Diamonds", 14), Card("Clubs", 13), Card("Hearts", 13)]
-# p2cards = [Card("Clubs", 14), Card("Hearts", 14), Card("Spades", 14), Card("Diamonds", 14), Card("Clubs", 13), Card("Hearts", 3)]
-
-# TEST CASE 2: testing that game properly handles when one player runs out of cards during a Tie. Expected that they should lose immediately
-# p1cards = [Card("Clubs", 14), Card("Hearts", 14), Card("Spades", 14), Card("Diamonds", 14), Card("Clubs", 13), Card("Hearts", 13)]
-# p2cards = [Card("Clubs", 14), Card("Hearts", 14), Card("Spades", 14), Card("Diamonds", 14), Card("Clubs", 13)]
-
-# TEST CASE 3: testing that game properly handles when one player has more cards than the other 
-# where p1 expected to win, after a few rounds.
-# should also show that the Player's hand doesn't just wrap back to original starting card, instead we want to emulate
-# real-life picking up of "stack" of cards from table, where the most recently placed card is placed top into our hand.
-# this prevents circular repetition of hands, and deadlock scenarios
-# p1cards = [Card("Clubs", 14), Card("Hearts", 14), Card("Spades", 14), Card("Diamonds", 14), Card("Clubs", 13), Card("Hearts", 13)]
-# p2cards = [Card("Clubs", 14), Card("Hearts", 14), Card("Spades", 14), Card("Diamonds", 14), Card("Clubs", 13), Card("Hearts", 2), Card("Hearts", 3)]
-
-# custom run case
-# g.play(custom_test=True, p1cards=p1cards, p2cards=p2cards)
-
-# default run case
-g.play(custom_test=False)
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Play a game of War and print it.")
+  parser.add_argument("--seed", type=int, default=None, help="replay the game dealt from this seed")
+  parser.add_argument("--round-limit", type=int, default=None, help="stop after this many rounds (default: no limit)")
+  parser.add_argument("--detect-cycles", action="store_true", help="end the game as a draw once the hands repeat")
+  parser.add_argument("--face-down", type=int, default=0, help="cards laid face down before each face up card of a War")
+  parser.add_argument("--pickup", choices=PICKUPS, default="reverse", help="order the round winner picks up the table")
+  parser.add_argument("--aces-low", action="store_true", help="Aces rank below 2s")
+  parser.add_argument("--profile", nargs="?", const="", default=None, metavar="FILE",
+                      help="time every phase of the game and print a summary to stderr; "
+                           "with FILE, also write collapsed stacks for flame graph tools")
+  args = parser.parse_args()
+
+  g = Game(num_players=2, seed=args.seed, rules=Rules(args.face_down, args.pickup, args.aces_low))
+  profiler = Profiler().attach(g) if args.profile is not None else None
+
+  # TEST CASE 1: testing that game properly handles War tie scenario, and properly terminates at end
+  # p1cards = [Card("Clubs", 14), Card("Hearts", 14), Card("Spades", 14), Card("Diamonds", 14), Card("Clubs", 13), Card("Hearts", 13)]
+  # p2cards = [Card("Clubs", 14), Card("Hearts", 14), Card("Spades", 14), Card("Diamonds", 14), Card("Clubs", 13), Card("Hearts", 3)]
+
+  # TEST CASE 2: testing that game properly handles when one player runs out of cards during a Tie. Expected that they should lose immediately
+  # p1cards = [Card("Clubs", 14), Card("Hearts", 14), Card("Spades", 14), Card("Diamonds", 14), Card("Clubs", 13), Card("Hearts", 13)]
+  # p2cards = [Card("Clubs", 14), Card("Hearts", 14), Card("Spades", 14), Card("Diamonds", 14), Card("Clubs", 13)]
+
+  # TEST CASE 3: testing that game properly handles when one player has more cards than the other 
+  # where p1 expected to win, after a few rounds.
+  # should also show that the Player's hand doesn't just wrap back to original starting card, instead we want to emulate
+  # real-life picking up of "stack" of cards from table, where the most recently placed card is placed top into our hand.
+  # this prevents circular repetition of hands, and deadlock scenarios
+  # p1cards = [Card("Clubs", 14), Card("Hearts", 14), Card("Spades", 14), Card("Diamonds", 14), Card("Clubs", 13), Card("Hearts", 13)]
+  # p2cards = [Card("Clubs", 14), Card("Hearts", 14), Card("Spades", 14), Card("Diamonds", 14), Card("Clubs", 13), Card("Hearts", 2), Card("Hearts", 3)]
+
+  # custom run case
+  # g.play(custom_test=True, p1cards=p1cards, p2cards=p2cards)
+
+  # default run case
+  result = g.play(round_limit=args.round_limit or math.inf, custom_test=False, detect_cycles=args.detect_cycles)
+  if profiler is not None:
+    print(profiler.report(), file=sys.stderr)
+    if args.profile:
+      profiler.writeCollapsed(args.profile)
+  # exit status 2 if the game ended without a winner or a detected draw (round limit reached)
+  exit(0 if result.winner is not None or result.cycleLength else 2)
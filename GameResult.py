@@ -0,0 +1,25 @@
+class GameResult(object):
+    """
+    GameResult holds the outcome of one finished Game in a structured form, so callers don't have to scrape printed output.
+    winner is the seat index (0-based) of the winning Player, or None if the game was stopped by the round limit.
+    wars counts the Rounds that needed at least one Tie to resolve, and longestWar is the most Tie turns seen in a single Round.
+    cycleLength is non-zero when the game was stopped as a draw because its hands started repeating with that period.
+    """
+    __slots__ = ("winner", "rounds", "wars", "longestWar", "cycleLength")
+
+    def __init__(self, winner, rounds:int = 0, wars:int = 0, longestWar:int = 0, cycleLength:int = 0) -> None:
+        self.winner = winner
+        self.rounds = rounds
+        self.wars = wars
+        self.longestWar = longestWar
+        self.cycleLength = cycleLength
+
+    def __repr__(self) -> str:
+        return "GameResult(winner={}, rounds={}, wars={}, longestWar={}, cycleLength={})".format(
+            self.winner, self.rounds, self.wars, self.longestWar, self.cycleLength)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, GameResult):
+            return NotImplemented
+        return ((self.winner, self.rounds, self.wars, self.longestWar, self.cycleLength) ==
+                (other.winner, other.rounds, other.wars, other.longestWar, other.cycleLength))
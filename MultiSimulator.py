@@ -0,0 +1,145 @@
+"""
+Headless simulation of War with any number of players.
+
+Game's playTurn() compares every card played against all the cards already on the table, so a turn costs O(P^2) for
+P players, and it removes eliminated Players from the list it is iterating over, which skips the next Player. That's
+fine for 2 players, but tables of 8 to 64 seats need something that scales. MultiSimulator plays on card values like
+Simulator, and:
+  - resolves a turn in a single pass over the seats, keeping a running top card and the seats that played it, O(P)
+  - keeps the seats still in the game in a doubly linked list, so eliminating a seat is O(1) and a turn only visits
+    seats that are still playing
+  - settles ties among the seats tied for the top card only: those seats keep playing single cards (a War) until one
+    of them plays the highest card; everyone else's cards just stay on the table for the winner
+
+Like Game, a seat that runs out of cards in the middle of a War is eliminated immediately, and a seat that ends a round
+with no cards is out of the game. If every seat in a War runs out, nobody collects the table and its cards carry over
+to the winner of the next round. With 2 players the results are exactly the same as Simulator's. With more, they are
+not Game's: Game's Wars are played by every seat, and its eliminations skip seats.
+"""
+
+from CycleDetector import CycleDetector
+from GameResult import GameResult
+from OutcomeCache import OutcomeCache, handKey
+from Simulator import Simulator
+from collections import deque
+
+# prefix of the OutcomeCache keys of games of more than 2 seats. A handKey() starts with the number of hands, and the
+# key of no hands at all is just that byte, so no handKey() starts with this
+MULTI_KEY_PREFIX = b"\x00"
+
+
+class MultiSimulator(Simulator):
+    """
+    Runs complete games between num_players seats without any output, returning a GameResult for each game (winner is
+    the winning seat). Everything else works like Simulator: playHands(*hands), playGame(), playSeed(), iterGames()
+    and run(), with the same round_limit, rng, cache and detect_cycles options (cutoff is 2 player only). Games are
+    dealt from a shoe of decks standard decks, so large tables still get a fair number of cards each.
+    With 3 or more seats the games differ from Game's (see the module docstring), so their results are cached under
+    keys of their own and never mix with Game's results in a shared OutcomeCache.
+    """
+    def __init__(self, num_players:int = 4, round_limit:int = 10000, rng = None, cache:OutcomeCache = None, detect_cycles:bool = False, decks:int = 1) -> None:
+        super().__init__(round_limit, rng, cache, detect_cycles)
+        self.num_players = num_players
+        self.decks = decks
+
+    def cacheKey(self, hands:list) -> bytes:
+        # 2 seat games are the same as Game's and Simulator's, and can share their results
+        if len(hands) > 2:
+            return MULTI_KEY_PREFIX + handKey(hands)
+        return handKey(hands)
+
+    def playOut(self, *hands:list) -> GameResult:
+        """ Plays the game from the given hands, one list of card values per seat, without consulting the cache. """
+        hands = [deque(hand) for hand in hands]
+        head = len(hands)  # sentinel of the circular linked list of seats still in the game
+        nxt = list(range(1, head + 2))
+        prv = list(range(-1, head))
+        nxt[head] = 0
+        prv[0] = head
+        active = head
+
+        def eliminate(seat:int) -> int:
+            # unlinks seat in O(1), returns how many seats are left
+            nxt[prv[seat]] = nxt[seat]
+            prv[nxt[seat]] = prv[seat]
+            return active - 1
+
+        # seats dealt no cards are out before the game starts
+        for seat in range(head):
+            if not hands[seat]:
+                active = eliminate(seat)
+        limit = self.round_limit
+        rounds = wars = longestWar = cycleLength = 0
+        carry = []  # cards left on the table by a War that every contender ran out of
+        detector = CycleDetector(hands) if self.detect_cycles else None
+
+        while active > 1 and rounds < limit:
+            rounds += 1
+            tableCards = carry
+            carry = []
+            emptied = []  # seats that played their last card this round
+            top = 0
+            topSeats = []
+            seat = nxt[head]
+            while seat != head:
+                hand = hands[seat]
+                card = hand.popleft()
+                tableCards.append(card)
+                if not hand:
+                    emptied.append(seat)
+                if card > top:
+                    top = card
+                    topSeats = [seat]
+                elif card == top:
+                    topSeats.append(seat)
+                seat = nxt[seat]
+
+            ties = 0
+            while len(topSeats) > 1:
+                # War between the seats tied for the top card, in seat order
+                ties += 1
+                contenders = topSeats
+                top = 0
+                topSeats = []
+                for seat in contenders:
+                    hand = hands[seat]
+                    if not hand:
+                        active = eliminate(seat)
+                        if active == 1:
+                            break
+                        continue
+                    card = hand.popleft()
+                    tableCards.append(card)
+                    if not hand:
+                        emptied.append(seat)
+                    if card > top:
+                        top = card
+                        topSeats = [seat]
+                    elif card == top:
+                        topSeats.append(seat)
+                if active == 1:
+                    break
+            if ties:
+                wars += 1
+                if ties > longestWar:
+                    longestWar = ties
+            if active == 1:
+                break
+
+            if topSeats:
+                tableCards.reverse()
+                hands[topSeats[0]].extend(tableCards)
+            else:
+                carry = tableCards
+            for seat in emptied:
+                # skip seats already eliminated during the War, and seats that just won cards back
+                if not hands[seat] and nxt[prv[seat]] == seat:
+                    active = eliminate(seat)
+            # carried cards aren't in any hand, so only compare states with an empty table
+            if detector is not None and not carry:
+                cycleLength = detector.check(hands)
+                if cycleLength:
+                    break
+
+        winner = nxt[head] if active == 1 else None
+        return GameResult(winner, rounds, wars, longestWar, cycleLength)
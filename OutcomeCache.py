@@ -0,0 +1,95 @@
+"""
+Cache of finished game outcomes keyed by the starting deal.
+
+War has no choices in it: once the cards are dealt, the whole game is decided. Suits never affect play either, so two
+deals with the same sequence of values in every hand play out identically. handKey() turns the starting hands into a
+compact canonical key (card values only, two per byte), and OutcomeCache maps those keys to GameResults so a deal
+that has been played before doesn't have to be replayed.
+
+The cache keeps a bounded LRU in memory, and can optionally write through to an on-disk dbm file that persists
+between runs.
+"""
+
+from GameResult import GameResult
+from collections import OrderedDict
+import dbm
+import struct
+
+# winner (-1 for no winner), rounds, wars, longestWar, cycleLength
+RESULT_FORMAT = struct.Struct("<bIIII")
+
+
+def handKey(hands:list) -> bytes:
+    """
+    Builds the canonical key for a deal from each player's starting hand, given as lists of card values (2-14) with
+    the top of the hand first. The key is the number of cards in every hand, followed by all the card values packed
+    two per byte (value - 2 fits in 4 bits).
+    """
+    values = []
+    for hand in hands:
+        values.extend(hand)
+    if len(values) % 2:
+        values.append(2)  # pad to a whole byte, the hand sizes at the front keep the key unambiguous
+    sizes = b"".join(len(hand).to_bytes(2, "little") for hand in hands)
+    packed = bytes((values[idx] - 2) << 4 | (values[idx + 1] - 2) for idx in range(0, len(values), 2))
+    return bytes([len(hands)]) + sizes + packed
+
+
+class OutcomeCache(object):
+    """
+    LRU cache from handKey() keys to GameResults, holding at most max_entries results in memory. If path is given,
+    results are also stored in a dbm file at that path, and memory misses fall back to it.
+    Only results that don't depend on a round limit should be stored (see Simulator and Game for how they use it).
+    """
+    def __init__(self, max_entries:int = 100000, path:str = None) -> None:
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.store = dbm.open(path, "c") if path else None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key:bytes):
+        """ Returns the cached GameResult for key, or None if this deal hasn't been seen. """
+        result = self.entries.get(key)
+        if result is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+        if self.store is not None:
+            packed = self.store.get(key)
+            if packed is not None:
+                winner, rounds, wars, longestWar, cycleLength = RESULT_FORMAT.unpack(packed)
+                result = GameResult(None if winner < 0 else winner, rounds, wars, longestWar, cycleLength)
+                self.remember(key, result)
+                self.hits += 1
+                return result
+        self.misses += 1
+        return None
+
+    def put(self, key:bytes, result:GameResult) -> None:
+        """ Stores the result for key in memory, and on disk if there is a store. """
+        self.remember(key, result)
+        if self.store is not None:
+            winner = -1 if result.winner is None else result.winner
+            self.store[key] = RESULT_FORMAT.pack(winner, result.rounds, result.wars, result.longestWar, result.cycleLength)
+
+    def remember(self, key:bytes, result:GameResult) -> None:
+        # adds to the in memory LRU, evicting the least recently used entry when full
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def close(self) -> None:
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def __enter__(self) -> "OutcomeCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -1,21 +1,24 @@
 from Card import Card
 from Deck import Deck
+from collections import deque
 from typing import Union
 
 
 class Player(object):
     """
     Each Player has a "name" and "hand" attribute associated with them. This class allows modification of a Player's hand, which holds a number of cards. It also has some getter methods to display information about the player.
+    The hand is a deque, so playing from the front and collecting onto the end are both O(1) regardless of hand size.
     """
-    def __init__(self, name:str, hand:list = []) -> None:
+    def __init__(self, name:str, hand:list = None) -> None:
         self.name = name
-        self.hand = hand # list of cards fed in, defaults to empty hand
+        # copy of the cards fed in, defaults to empty hand. A fresh deque per Player, so hands are never shared
+        self.hand = deque(hand) if hand else deque()
 
-    def displayHand(self) -> None:
-        print("Player {}'s hand: ".format(self.name))
-        for card in self.hand:
-            if card:
-                print(card.show())
+    def displayHand(self) -> list:
+        # returns the lines of text showing the Player's hand, for a sink or the caller to write (see TextSink)
+        lines = ["Player {}'s hand: ".format(self.name)]
+        lines.extend(card.show() for card in self.hand if card)
+        return lines
 
     def handCount(self) -> int:
         # returns number of cards in the Player's hand
@@ -29,15 +32,15 @@ class Player(object):
         - Gives option of simply concatenating it to the end, this is used for initial collection from deck
         """
         if reverse:
-            self.hand = self.hand + cards[::-1]
+            self.hand.extend(reversed(cards))
         else:
-            self.hand = self.hand + cards
+            self.hand.extend(cards)
     
     def playCard(self) -> Union[Card, bool]:
         """
         Plays the Card from the front of the Player's hand. Returns False if no Card left in Player's hand
         """
-        card = self.hand.pop(0) if self.hand else False
+        card = self.hand.popleft() if self.hand else False
         return card
     
 
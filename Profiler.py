@@ -0,0 +1,158 @@
+"""
+Opt-in instrumentation of the game loop.
+
+A Profiler attaches to a single Game by wrapping that instance's own methods (and its Players' and sink's), so a Game
+that isn't being profiled runs exactly the code it always does, with no checks or hooks left behind. Once attached, it
+times every phase of the game:
+  deal      dealCards(), building and shuffling the Deck and splitting it
+  round     one playRound()
+  turn      a playTurn() that starts a Round
+  war       a playTurn() played because of a Tie
+  collect   a Player collecting the table
+  events    the sink handling an event (printing, encoding, writing)
+  cycles    the CycleDetector check after each Round
+  end       endGameMessage(), including the cache and the game over event
+Phases nest (a turn happens inside a round), and every phase is recorded under its full path, e.g. "round;war;events".
+For each path the Profiler keeps the number of calls, the total and self time, and how many memory blocks the
+interpreter had allocated on return compared with on entry (sys.getallocatedblocks()), which shows where garbage is
+being created. Simple counters (cards collected, events by kind) are kept alongside.
+
+report() prints a summary table, and collapsed() exports the self times in the collapsed stack format that
+flamegraph.pl, speedscope and similar tools read ("round;turn 1234" per line, in microseconds).
+"""
+
+from collections import Counter
+import sys
+import time
+
+
+class Profiler(object):
+    """
+    Collects phase timings for the Games it is attached to. Use attach(game) before the game starts playing, or
+    enter()/exit() and timed() to instrument anything else.
+    """
+    def __init__(self, clock = time.perf_counter_ns) -> None:
+        self.clock = clock
+        self.stack = []           # [path, start time, time spent in nested phases, allocated blocks on entry]
+        self.calls = Counter()    # path -> number of calls
+        self.totals = Counter()   # path -> total time in ns, including nested phases
+        self.selfTimes = Counter()
+        self.blocks = Counter()   # path -> change in allocated blocks
+        self.counters = Counter()
+
+    def enter(self, name:str) -> None:
+        path = self.stack[-1][0] + ";" + name if self.stack else name
+        self.stack.append([path, self.clock(), 0, sys.getallocatedblocks()])
+
+    def exit(self) -> None:
+        path, start, nested, startBlocks = self.stack.pop()
+        # measured after the stack entry is freed, so the Profiler's own bookkeeping cancels out
+        blocks = sys.getallocatedblocks()
+        elapsed = self.clock() - start
+        self.calls[path] += 1
+        self.totals[path] += elapsed
+        self.selfTimes[path] += elapsed - nested
+        self.blocks[path] += blocks - startBlocks
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+    def count(self, name:str, n:int = 1) -> None:
+        self.counters[name] += n
+
+    def timed(self, name:str, func):
+        """ Returns func wrapped to be recorded as phase name. """
+        def wrapper(*args, **kwargs):
+            self.enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.exit()
+        return wrapper
+
+    def attach(self, game) -> "Profiler":
+        """
+        Instruments game (before it is started) and returns the Profiler. Only this Game instance is affected.
+        """
+        game.dealCards = self.timed("deal", game.dealCards)
+        game.playRound = self.timed("round", game.playRound)
+        game.endGameMessage = self.timed("end", game.endGameMessage)
+
+        playTurn = game.playTurn
+        def profiledTurn():
+            # a turn played while the Round already has ties is part of a War
+            self.enter("war" if game.roundTies else "turn")
+            try:
+                return playTurn()
+            finally:
+                self.exit()
+        game.playTurn = profiledTurn
+
+        for p in game.seats:
+            self.attachPlayer(p)
+        game.sink = ProfiledSink(game.sink, self)
+
+        start = game.start
+        def profiledStart(*args, **kwargs):
+            start(*args, **kwargs)
+            # the CycleDetector only exists once the game has started
+            if game.detector is not None:
+                game.detector.check = self.timed("cycles", game.detector.check)
+        game.start = profiledStart
+        return self
+
+    def attachPlayer(self, player) -> None:
+        collectCards = player.collectCards
+        def profiledCollect(cards, *args, **kwargs):
+            self.enter("collect")
+            try:
+                collectCards(cards, *args, **kwargs)
+            finally:
+                self.exit()
+            self.counters["cards collected"] += len(cards)
+        player.collectCards = profiledCollect
+
+    def report(self) -> str:
+        """ Summary table of every phase path, slowest (by self time) first, followed by the counters. """
+        total = sum(self.selfTimes.values()) or 1
+        lines = ["{:<28} {:>10} {:>12} {:>12} {:>7} {:>10} {:>12}".format(
+            "phase", "calls", "total ms", "self ms", "self %", "ns/call", "blocks/call")]
+        for path, selfTime in self.selfTimes.most_common():
+            calls = self.calls[path]
+            lines.append("{:<28} {:>10,} {:>12.2f} {:>12.2f} {:>6.1f}% {:>10,.0f} {:>12.2f}".format(
+                path, calls, self.totals[path] / 1e6, selfTime / 1e6, 100 * selfTime / total,
+                self.totals[path] / calls, self.blocks[path] / calls))
+        for name, value in sorted(self.counters.items()):
+            lines.append("{}: {:,}".format(name, value))
+        return "\n".join(lines)
+
+    def collapsed(self) -> str:
+        """ Self time of every phase path in collapsed stack format, one "path microseconds" line per path. """
+        return "".join("{} {}\n".format(path, selfTime // 1000) for path, selfTime in sorted(self.selfTimes.items()))
+
+    def writeCollapsed(self, path:str) -> None:
+        with open(path, "w") as file:
+            file.write(self.collapsed())
+
+
+class ProfiledSink(object):
+    """ Wraps a Game's sink to time the events it handles and count them by kind. """
+    def __init__(self, sink, profiler:Profiler) -> None:
+        self.sink = sink
+        self.profiler = profiler
+        self.enabled = sink.enabled
+
+    def emit(self, event) -> None:
+        profiler = self.profiler
+        profiler.counters["events: " + event.kind] += 1
+        profiler.enter("events")
+        try:
+            self.sink.emit(event)
+        finally:
+            profiler.exit()
+
+    def flush(self) -> None:
+        self.sink.flush()
+
+    def __getattr__(self, name:str):
+        # anything else (e.g. TableSink.take()) goes to the wrapped sink
+        return getattr(self.sink, name)
@@ -0,0 +1,211 @@
+"""
+Compact binary archive of played games, with a streaming writer and a memory-mapped reader.
+
+A game is fully decided by its deal, so a replay stores the deal as one byte per card (Card codes, see Card.code())
+plus a fixed size record for every round: the seat that won it and how many cards it collected. That's enough to
+rebuild the hands at any point of the game, at 3 bytes per round instead of several lines of text per card.
+
+File layout (all integers little endian):
+  header:  b"WARR", version (1 byte)
+  games:   one record per game, back to back
+             number of players (1 byte), each starting hand size (2 bytes each), the dealt card codes
+             one round record per round: winning seat (1 byte), cards collected (2 bytes)
+             trailer: winner (signed byte, -1 for none), rounds played (4 bytes), cycle length (4 bytes)
+  index:   the file offset of every game record (8 bytes each)
+  footer:  number of games (8 bytes), b"WIDX"
+The index lets the reader jump straight to game N, and fixed size round records let it jump to round R, without
+reading anything else.
+"""
+
+from Card import Card
+from Events import DealEvent, GameOverEvent, RoundWonEvent
+from GameResult import GameResult
+from array import array
+from collections import deque
+import mmap
+import struct
+
+MAGIC = b"WARR"
+VERSION = 1
+FOOTER_MAGIC = b"WIDX"
+HEADER = struct.Struct("<4sB")
+ROUND = struct.Struct("<BH")        # winning seat, cards collected
+TRAILER = struct.Struct("<bII")     # winner, rounds, cycle length
+FOOTER = struct.Struct("<Q4s")      # number of games, magic
+
+
+class ReplayWriter(object):
+    """
+    Streams games into a replay file. Use it as a Game's sink (it understands DealEvent, RoundWonEvent and
+    GameOverEvent and ignores the rest), or call startGame(), addRound() and endGame() directly. close() writes the
+    index, so a file is only readable once its writer has been closed.
+    Games whose result came from an OutcomeCache are left out, since they were never played round by round, and
+    games played by a rule variant (see Rules) or by more than 2 players are refused with a ValueError, since the file
+    doesn't record the rules or which seats played each turn.
+    """
+    enabled = True
+
+    def __init__(self, path:str) -> None:
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION))
+        self.offsets = array("Q")
+        self.inGame = False
+
+    def emit(self, event) -> None:
+        if isinstance(event, RoundWonEvent):
+            self.addRound(event.winner, len(event.cards))
+        elif isinstance(event, DealEvent):
+            if event.rules is not None and not event.rules.isDefault():
+                # the rounds are replayed by the default rules, a variant game's would come out wrong
+                raise ValueError("replay files only record games played by the default rules, not {!r}".format(
+                    event.rules))
+            if len(event.hands) > 2:
+                # with 3 or more players Game can skip a seat's turn when another seat is eliminated, which the
+                # round records don't capture, so stateAt() couldn't rebuild the hands
+                raise ValueError("replay files only record 2 player games, not {} players".format(len(event.hands)))
+            self.startGame([[card.code() for card in cards] for name, cards in event.hands])
+        elif isinstance(event, GameOverEvent):
+            if event.cached:
+                # a result from the OutcomeCache has no rounds to record, and stateAt() needs them: leave it out
+                self.discardGame()
+            else:
+                self.endGame(event.result)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def startGame(self, hands:list) -> None:
+        """ Starts a new game record from each player's starting hand, as lists of Card codes. """
+        if self.inGame:
+            raise ValueError("the previous game was never ended")
+        self.offsets.append(self.file.tell())
+        self.file.write(bytes([len(hands)]))
+        self.file.write(struct.pack("<{}H".format(len(hands)), *[len(hand) for hand in hands]))
+        for hand in hands:
+            self.file.write(bytes(hand))
+        self.inGame = True
+
+    def addRound(self, winner:int, cards:int) -> None:
+        """ Records a round won by seat winner, who collected cards cards from the table. """
+        self.file.write(ROUND.pack(winner, cards))
+
+    def endGame(self, result:GameResult) -> None:
+        """ Finishes the current game record with its result. """
+        winner = -1 if result.winner is None else result.winner
+        self.file.write(TRAILER.pack(winner, result.rounds, result.cycleLength))
+        self.inGame = False
+
+    def discardGame(self) -> None:
+        """ Drops the current game record, as if it had never been started. """
+        if self.inGame:
+            self.file.seek(self.offsets.pop())
+            self.file.truncate()
+            self.inGame = False
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        self.file.write(self.offsets.tobytes())
+        self.file.write(FOOTER.pack(len(self.offsets), FOOTER_MAGIC))
+        self.file.close()
+
+    def __enter__(self) -> "ReplayWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ReplayReader(object):
+    """
+    Memory-maps a replay file. len(reader) is the number of games, and reader.game(n) (or reader[n]) returns game n
+    as a ReplayGame, reading only that game's header.
+    """
+    def __init__(self, path:str) -> None:
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("{} is not a version {} replay file".format(path, VERSION))
+        numGames, footerMagic = FOOTER.unpack_from(self.data, len(self.data) - FOOTER.size)
+        if footerMagic != FOOTER_MAGIC:
+            raise ValueError("{} has no index, was its ReplayWriter closed?".format(path))
+        self.indexStart = len(self.data) - FOOTER.size - 8 * numGames
+        self.offsets = memoryview(self.data)[self.indexStart:len(self.data) - FOOTER.size].cast("Q")
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, n:int) -> "ReplayGame":
+        return self.game(n)
+
+    def game(self, n:int) -> "ReplayGame":
+        start = self.offsets[n]
+        end = self.offsets[n + 1] if n + 1 < len(self.offsets) else self.indexStart
+        return ReplayGame(self.data, start, end)
+
+    def close(self) -> None:
+        self.offsets.release()
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self) -> "ReplayReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ReplayGame(object):
+    """
+    One game of a replay file: the starting hands, the result, and random access to the round records.
+    stateAt(r) deterministically replays the recorded rounds to rebuild every hand after round r.
+    """
+    def __init__(self, data, start:int, end:int) -> None:
+        self.data = data
+        numPlayers = data[start]
+        sizes = struct.unpack_from("<{}H".format(numPlayers), data, start + 1)
+        dealStart = start + 1 + 2 * numPlayers
+        self.hands = []
+        for size in sizes:
+            self.hands.append(list(data[dealStart:dealStart + size]))
+            dealStart += size
+        self.roundsStart = dealStart
+        self.trailerStart = end - TRAILER.size
+        winner, rounds, cycleLength = TRAILER.unpack_from(data, self.trailerStart)
+        self.winner = None if winner < 0 else winner
+        self.rounds = rounds
+        self.cycleLength = cycleLength
+
+    def numRounds(self) -> int:
+        # number of rounds recorded, one less than rounds if the game ended in the middle of a round
+        return (self.trailerStart - self.roundsStart) // ROUND.size
+
+    def round(self, r:int) -> tuple:
+        """ Returns (winning seat, cards collected) for round r, counting from 1 like Game.rounds. """
+        if not 1 <= r <= self.numRounds():
+            raise IndexError("round {} was not recorded".format(r))
+        return ROUND.unpack_from(self.data, self.roundsStart + (r - 1) * ROUND.size)
+
+    def stateAt(self, r:int) -> list:
+        """
+        Rebuilds the players' hands (lists of Cards, top of the hand first) after round r, 0 being the deal. Each
+        round both players play one card per turn until the recorded number of cards is on the table, then the
+        recorded winner collects the table reversed, like a 2 player Game under the default rules (the only games a
+        ReplayWriter records).
+        """
+        hands = [deque(hand) for hand in self.hands]
+        for roundNum in range(1, r + 1):
+            winner, cards = self.round(roundNum)
+            tableCards = []
+            while len(tableCards) < cards:
+                for hand in hands:
+                    if hand:
+                        tableCards.append(hand.popleft())
+            tableCards.reverse()
+            hands[winner].extend(tableCards)
+        return [[Card.fromCode(code) for code in hand] for hand in hands]
+
+    def result(self) -> GameResult:
+        # wars aren't stored in the replay, so only the winner, rounds and cycle length are filled in
+        return GameResult(self.winner, self.rounds, cycleLength=self.cycleLength)
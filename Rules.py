@@ -0,0 +1,128 @@
+"""
+Rule variants for Game.
+
+Game plays by the rules described in the README: one face up card per player in a War, the round winner picks up the
+table in reverse, and Aces are high. Rules selects the common variants instead:
+  face_down   cards each player lays face down before every face up card of a War (the Wikipedia rule is 1; a
+              "War of N cards" is N - 1). Running out of cards while laying them still loses the game (Assumption 2)
+  pickup      the order the round winner adds the table to their hand: "reverse" (most recently played first, the
+              default), "forward" (as played), "sorted" (highest card first) or "random" (shuffled, reproducible from
+              the Game's seed)
+  aces_low    Aces rank below 2s
+
+Nothing in Game checks these settings while it plays. When a Game starts, Rules.apply() swaps in the specialised
+implementation of each part of the round that a variant changes (the War turn, picking up the table) as attributes
+of that Game instance, and leaves the default methods in place for the rest. Aces low needs no code at all: the Aces
+dealt are replaced by LowAce Cards, whose value is 1, so the usual comparisons rank them lowest.
+
+Results of variant games don't go into an OutcomeCache (its keys only describe the deal), and random pickup makes a
+game depend on more than its hands, so it turns off cycle detection. Replay files only hold games played by the
+default rules: a ReplayWriter refuses any other game when it is dealt.
+"""
+
+from Card import Card, SUIT_INDEX
+from Events import PlayerEliminatedEvent
+from operator import attrgetter
+from random import Random
+import random
+
+PICKUPS = ("reverse", "forward", "sorted", "random")
+ACE = 14
+
+
+class LowAce(Card):
+    """ An Ace that ranks below a 2 (value 1). It shows and encodes (code()) as the Ace it replaces. """
+    __slots__ = ()
+
+    def __init__(self, suit:str) -> None:
+        super().__init__(suit, 1)
+
+    def show(self) -> str:
+        return "Ace of {}".format(self.suit)
+
+    def code(self) -> int:
+        return (ACE - 2) * 4 + SUIT_INDEX[self.suit]
+
+
+LOW_ACES = {suit: LowAce(suit) for suit in SUIT_INDEX}
+
+
+class Rules(object):
+    """
+    A rule variant, see the module docstring. Rules() are the default rules. Pass it to Game(rules=...); the Game
+    calls apply() every time it starts a game.
+    """
+    __slots__ = ("face_down", "pickup", "aces_low")
+
+    def __init__(self, face_down:int = 0, pickup:str = "reverse", aces_low:bool = False) -> None:
+        if face_down < 0:
+            raise ValueError("face_down can't be negative")
+        if pickup not in PICKUPS:
+            raise ValueError("pickup must be one of {}".format(", ".join(PICKUPS)))
+        self.face_down = face_down
+        self.pickup = pickup
+        self.aces_low = aces_low
+
+    def isDefault(self) -> bool:
+        return not self.face_down and self.pickup == "reverse" and not self.aces_low
+
+    def deterministic(self) -> bool:
+        # whether the deal alone decides the game
+        return self.pickup != "random"
+
+    def apply(self, game) -> None:
+        """
+        Sets game up to play by these rules, once its hands have been dealt: replaces game.playWarTurn and
+        game.collectTable with the variant's implementations. Under the default rules the Game isn't touched at all
+        (not even its __dict__, which would slow down every attribute lookup on it).
+        """
+        if self.aces_low:
+            for p in game.players:
+                hand = list(p.hand)
+                p.hand.clear()
+                p.hand.extend(LOW_ACES[card.suit] if card.val == ACE else card for card in hand)
+        if self.face_down:
+            game.playWarTurn = faceDownWarTurn(game, self.face_down)
+        if self.pickup != "reverse":
+            game.collectTable = pickupResolver(game, self.pickup)
+
+    def __repr__(self) -> str:
+        return "Rules(face_down={}, pickup={!r}, aces_low={})".format(self.face_down, self.pickup, self.aces_low)
+
+
+def faceDownWarTurn(game, face_down:int):
+    """ Returns game's War turn for face_down cards face down: every player lays them on the table, then plays a turn. """
+    def playWarTurn() -> tuple:
+        tableCards = game.tableCards
+        for p in list(game.players):
+            for laid in range(face_down):
+                card = p.playCard()
+                if not card:
+                    if game.verbose:
+                        game.sink.emit(PlayerEliminatedEvent(game.rounds, p.name))
+                    if game.eliminate(p):
+                        return (game.winner, [])
+                    break
+                tableCards.append(card)
+        return game.playTurn()
+    return playWarTurn
+
+
+def pickupResolver(game, pickup:str):
+    """ Returns game's collectTable() for the pickup order: the round winner adds the table cards in that order. """
+    tableCards = game.tableCards
+    if pickup == "forward":
+        def collectTable(winner) -> None:
+            winner.collectCards(tableCards, reverse=False)
+    elif pickup == "sorted":
+        value = attrgetter("val")
+        def collectTable(winner) -> None:
+            winner.collectCards(sorted(tableCards, key=value, reverse=True), reverse=False)
+    else:
+        # its own stream, seeded from the deal, so a seeded game is still reproducible
+        rng = Random("pickup:{}".format(game.seed)) if game.seed is not None else (game.rng or random)
+        shuffle = rng.shuffle
+        def collectTable(winner) -> None:
+            shuffle(tableCards)
+            winner.collectCards(tableCards, reverse=False)
+    return collectTable
@@ -0,0 +1,284 @@
+"""
+Asyncio server that hosts many live War tables in one process.
+
+Clients connect over TCP (or a Unix socket) and send one command per line:
+  new [players] [decks] [seed]   start a new table (and watch it), replies with its table id and seed (2 to
+                                 MAX_SEATS players, 1 to MAX_DECKS decks)
+  watch <table>                  stream the events of a running table
+  tables                         list the running tables
+  quit                           close the connection
+Everything the server sends is one JSON object per line: replies to commands, and the game events of every table the
+client watches (the same events Game emits, see Events.py, with a "table" field added).
+
+Every table is a Game stepped with playRound() by a single ticker coroutine. Each tick a table plays at most
+rounds_per_tick rounds and stops early once it has used its latency budget, and the ticker yields to the event loop
+every few milliseconds, so one event loop can share its time fairly between thousands of tables and their clients.
+The events a table produced during a tick are sent to each watcher as one batched write. Every client has a bounded
+outbox: when a watcher falls behind and its outbox is full, the table skips its turns until that client's writes
+have drained (backpressure), instead of buffering without limit.
+
+Usage: python3 Server.py --port 8765   (or --unix /tmp/war.sock)
+"""
+
+from Game import Game
+from collections import deque
+import argparse
+import asyncio
+import itertools
+import json
+import time
+
+
+class TableSink(object):
+    """ Game sink that encodes a table's events as JSON lines, held until the table publishes them. """
+    enabled = True
+
+    def __init__(self, table:int) -> None:
+        self.table = table
+        self.pending = []
+
+    def emit(self, event) -> None:
+        fields = event.toDict()
+        fields["table"] = self.table
+        self.pending.append(encodeLine(fields))
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        # everything emitted since the last take(), as one chunk
+        batch = b"".join(self.pending)
+        self.pending = []
+        return batch
+
+
+ENCODER = json.JSONEncoder(separators=(",", ":"))
+# Game's playTurn() is O(P^2) for P players, so tables are capped to keep every table's rounds within the budget
+MAX_SEATS = 16
+MAX_DECKS = 8
+
+
+def encodeLine(fields:dict) -> bytes:
+    return ENCODER.encode(fields).encode() + b"\n"
+
+
+class Client(object):
+    """
+    One connection. Outgoing chunks are queued in an outbox that pump() writes to the socket, coalescing whatever has
+    queued up into a single write followed by drain(). While drain() waits on a slow reader the outbox fills up, and
+    once max_pending chunks are waiting the client counts as full, which holds back the tables it watches.
+    """
+    def __init__(self, writer:asyncio.StreamWriter, max_pending:int = 64) -> None:
+        self.writer = writer
+        self.max_pending = max_pending
+        self.outbox = deque()
+        self.ready = asyncio.Event()  # set while the outbox has something to write
+        self.closing = False
+        self.watching = set()
+
+    def send(self, chunk:bytes) -> None:
+        # never blocks: the tables check full() before playing, and replies to commands are tiny
+        self.outbox.append(chunk)
+        self.ready.set()
+
+    def full(self) -> bool:
+        return len(self.outbox) >= self.max_pending
+
+    def close(self) -> None:
+        # lets pump() finish writing what's queued and return
+        self.closing = True
+        self.ready.set()
+
+    async def pump(self) -> None:
+        outbox = self.outbox
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            if outbox:
+                batch = b"".join(outbox)
+                outbox.clear()
+                self.writer.write(batch)
+                await self.writer.drain()
+            if self.closing and not outbox:
+                return
+
+
+class Table(object):
+    """
+    A live Game and the clients watching it. While nobody is watching, the Game doesn't build its events at all (only
+    the game over event is always emitted), so unwatched tables play at full speed.
+    """
+    def __init__(self, table:int, game:Game) -> None:
+        self.id = table
+        self.game = game
+        self.watchers = []
+        game.verbose = False
+
+    def addWatcher(self, client:"Client") -> None:
+        if client not in self.watchers:
+            self.watchers.append(client)
+            client.watching.add(self)
+            self.game.verbose = True
+
+    def removeWatcher(self, client:"Client") -> None:
+        if client in self.watchers:
+            self.watchers.remove(client)
+            self.game.verbose = bool(self.watchers)
+
+    def publish(self) -> None:
+        """ Sends everything the Game emitted since the last publish to every watcher, one chunk per watcher. """
+        batch = self.game.sink.take()
+        if batch:
+            for client in self.watchers:
+                client.send(batch)
+
+    def held(self) -> bool:
+        # backpressure: don't play further ahead of a watcher whose outbox is full
+        for client in self.watchers:
+            if client.full():
+                return True
+        return False
+
+
+class GameServer(object):
+    """
+    Runs every table on one event loop. Each tick (seconds), every table that isn't held back by a full watcher plays
+    up to rounds_per_tick rounds, stopping early once it has spent budget seconds of CPU time, then publishes what
+    happened. The ticker yields to the event loop every slice seconds, so client I/O is never stuck behind a long
+    tick. Games end as draws once their hands repeat, or after round_limit rounds.
+    """
+    def __init__(self, tick:float = 0.01, rounds_per_tick:int = 1, budget:float = 0.001, round_limit:int = 10000, max_pending:int = 64, slice:float = 0.005) -> None:
+        self.tick = tick
+        self.rounds_per_tick = rounds_per_tick
+        self.budget = budget
+        self.round_limit = round_limit
+        self.max_pending = max_pending
+        self.slice = slice
+        self.tables = {}
+        self.ids = itertools.count(1)
+
+    def newTable(self, num_players:int = 2, decks:int = 1, seed:int = None, watcher:Client = None) -> Table:
+        """
+        Creates a table (watched by watcher, if given) and deals it. It plays from the next tick on. Raises ValueError
+        for fewer than 2 or more than MAX_SEATS players, or for fewer than 1 or more than MAX_DECKS decks.
+        """
+        if not 2 <= num_players <= MAX_SEATS:
+            raise ValueError("players must be between 2 and {}".format(MAX_SEATS))
+        if not 1 <= decks <= MAX_DECKS:
+            raise ValueError("decks must be between 1 and {}".format(MAX_DECKS))
+        tableId = next(self.ids)
+        table = Table(tableId, Game(num_players, seed=seed, sink=TableSink(tableId), decks=decks))
+        if watcher is not None:
+            table.addWatcher(watcher)
+        table.game.start(round_limit=self.round_limit, detect_cycles=True)
+        self.tables[tableId] = table
+        return table
+
+    def step(self, table:Table) -> None:
+        """ Plays one tick of a table, within rounds_per_tick rounds and the latency budget. """
+        game = table.game
+        clock = time.perf_counter
+        deadline = clock() + self.budget
+        for step in range(self.rounds_per_tick):
+            if not game.playRound() or clock() >= deadline:
+                break
+        table.publish()
+
+    async def runTicks(self) -> None:
+        """
+        The scheduler: steps every table once per tick. Tables are plain objects stepped in turn rather than a task
+        each, so thousands of tables cost one timer per tick instead of thousands.
+        """
+        clock = time.perf_counter
+        while True:
+            tickStart = sliceStart = clock()
+            for table in list(self.tables.values()):
+                if table.game.over:
+                    table.publish()  # the game over event, and anything emitted while dealing
+                    del self.tables[table.id]
+                    continue
+                if table.held():
+                    continue  # backpressure: a watcher is behind, let it catch up first
+                self.step(table)
+                if clock() - sliceStart >= self.slice:
+                    await asyncio.sleep(0)
+                    sliceStart = clock()
+            await asyncio.sleep(max(0.0, self.tick - (clock() - tickStart)))
+
+    async def handle(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter) -> None:
+        """ Serves one client connection: reads commands until quit or disconnect. """
+        client = Client(writer, self.max_pending)
+        pump = asyncio.get_running_loop().create_task(client.pump())
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                words = line.decode(errors="replace").split()
+                if not words:
+                    continue
+                if words[0] == "quit":
+                    break
+                try:
+                    self.command(client, words)
+                except (ValueError, KeyError) as error:
+                    client.send(encodeLine({"event": "error", "command": line.decode(errors="replace").strip(), "message": str(error)}))
+        finally:
+            for table in client.watching:
+                table.removeWatcher(client)
+            client.close()
+            try:
+                await pump
+            except ConnectionError:
+                pass  # the client went away, nothing left to write to
+            writer.close()
+
+    def command(self, client:Client, words:list) -> None:
+        if words[0] == "new":
+            args = [int(word) for word in words[1:4]]
+            table = self.newTable(*args, watcher=client)
+            client.send(encodeLine({"event": "table", "table": table.id, "seed": table.game.seed}))
+        elif words[0] == "watch":
+            if len(words) != 2:
+                raise ValueError("usage: watch TABLE")
+            table = self.tables[int(words[1])]
+            table.addWatcher(client)
+            client.send(encodeLine({"event": "watching", "table": table.id, "round": table.game.rounds}))
+        elif words[0] == "tables":
+            client.send(encodeLine({"event": "tables", "tables": sorted(self.tables)}))
+        else:
+            raise ValueError("unknown command")
+
+    async def serve(self, host:str = "127.0.0.1", port:int = 8765, path:str = None) -> None:
+        """ Listens on host:port, or on the Unix socket path if given, and runs the tables until cancelled. """
+        ticker = asyncio.get_running_loop().create_task(self.runTicks())
+        if path:
+            server = await asyncio.start_unix_server(self.handle, path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            ticker.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host many live War tables over TCP or a Unix socket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--tick", type=float, default=0.01, help="seconds between a table's steps")
+    parser.add_argument("--rounds-per-tick", type=int, default=1, help="rounds a table plays each tick")
+    parser.add_argument("--budget", type=float, default=0.001, help="most CPU seconds a table may use per tick")
+    parser.add_argument("--round-limit", type=int, default=10000, help="rounds before a game is called a draw")
+    args = parser.parse_args()
+
+    server = GameServer(args.tick, args.rounds_per_tick, args.budget, args.round_limit)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,201 @@
+"""
+Headless simulation of 2 player War games.
+
+Game.play() returns a GameResult too, but it moves Card objects between Players and builds an event for every step of
+the game whenever its sink is enabled, which is more than running thousands of games needs. The Simulator plays by
+exactly the same rules as Game (see the README), but works on plain card values in bare deques, emits no events, and
+returns a GameResult for every game played.
+
+Dealing mirrors Deck: the deck is built in the same order as Deck.construct(), shuffled with the same Fisher-Yates
+algorithm, and dealt from the top of the deck in rotation like Deck.splitDeck(). Every Game deals from its own
+Random(seed) rather than the random module, so seeding the random module doesn't make the two deal alike: to play the
+same deal (and get the same result) in both, use Simulator().playSeed(seed) and Game(seed=seed), or pass the same
+seeded random.Random as rng to each.
+"""
+
+from Card import CARDS
+from CycleDetector import CycleDetector
+from Deck import bulkShuffle, makeRng
+from GameResult import GameResult
+from OutcomeCache import OutcomeCache, handKey
+from collections import deque
+from random import Random
+
+# card values of a standard deck, in the same order Deck.construct() builds them (4 suits for each value)
+DECK_VALUES = [card.val for card in CARDS]
+# with cutoff, positions are only checked for a decided result once a hand is down to this many cards
+CUTOFF_CARDS = 8
+
+
+def dealValues(num_split:int = 2, rng:Random = None, decks:int = 1) -> list:
+    """
+    Shuffles a fresh deck of card values (decks standard decks mixed together) and splits it num_split ways, returns a
+    list of value lists (one per player).
+    random.shuffle draws the same random numbers as Deck.shuffle(), and the top of the deck is the end of the list,
+    so reversing and taking every num_split-th card reproduces Deck.splitDeck()'s rotating deal.
+    Shuffles with the given rng (random.Random or NumPy Generator) if there is one, otherwise with the global random
+    module. Deck(rng=rng) would deal exactly the same cards.
+    """
+    values = DECK_VALUES * decks
+    makeRng(rng=rng).shuffle(values)
+    values.reverse()
+    return [values[split::num_split] for split in range(num_split)]
+
+
+def dealBatch(num_games:int, rng = None) -> tuple:
+    """
+    Deals num_games 2 player games at once with bulkShuffle(), returns (p1hands, p2hands). With a NumPy Generator the
+    hands are (num_games, 26) uint8 arrays; otherwise they are lists of value lists, the same deals as calling
+    dealValues(2, rng) num_games times.
+    """
+    decks = bulkShuffle(num_games, rng)
+    if isinstance(decks, list):
+        deals = [[DECK_VALUES[code] for code in reversed(codes)] for codes in decks]
+        return [deal[0::2] for deal in deals], [deal[1::2] for deal in deals]
+    values = (decks[:, ::-1] >> 2) + 2  # card code to value, see Card.code()
+    return values[:, 0::2], values[:, 1::2]
+
+
+class Simulator(object):
+    """
+    Runs complete 2 player games without any output. playHands() plays a single game from the given hands,
+    playGame() deals and plays a fresh game, and run()/iterGames() play num_games in a row.
+    Unlike Game, round_limit defaults to a finite number: with the fixed pickup order most shuffled deals repeat
+    forever, and a game stopped by the limit is reported with winner None.
+    Pass a seeded rng (random.Random or NumPy Generator) to get a reproducible sequence of deals independent of the
+    global random state, and use playSeed() to replay the game Game(seed=seed) would play.
+    With an OutcomeCache, deals that have already been played return their cached result instead of being replayed.
+    With detect_cycles, a game whose hands start repeating is stopped right away as a draw (see CycleDetector).
+    With cutoff, a game whose result is already certain (see Analysis.decidedWinner()) isn't played to the end; its
+    GameResult is the same as if it had been. Only positions whose losing hand has at most CUTOFF_CARDS cards are
+    looked for, and that hand must hold every card of the game up to some value, so with one deck the check only runs
+    when a hand is down to exactly 4 or 8 cards. In normal deals it rarely fires: it saves the last few rounds of games
+    that have already become one sided, not the bulk of a typical game.
+    """
+    num_players = 2
+    decks = 1
+
+    def __init__(self, round_limit:int = 10000, rng = None, cache:OutcomeCache = None, detect_cycles:bool = False, cutoff:bool = False) -> None:
+        self.round_limit = round_limit
+        self.rng = rng
+        self.cache = cache
+        self.detect_cycles = detect_cycles
+        self.cutoff = cutoff
+
+    def playHands(self, *hands:list) -> GameResult:
+        """
+        Plays one game from the given starting hands (lists of card values, front of the list is the top of the hand),
+        e.g. playHands(p1cards, p2cards). Follows Game's rules: the round winner collects the table reversed, and a
+        Player that runs out of cards during a War loses the game immediately.
+        """
+        cache = self.cache
+        if cache is None:
+            return self.playOut(*hands)
+        key = self.cacheKey(hands)
+        result = cache.get(key)
+        # a game that finished within the round limit plays out the same under this limit too, and so does a cycle
+        # found within it, as long as cycles are being detected
+        if result is not None and result.rounds <= self.round_limit and (result.winner is not None or self.detect_cycles):
+            return result
+        result = self.playOut(*hands)
+        if result.winner is not None or result.cycleLength:
+            cache.put(key, result)
+        return result
+
+    def cacheKey(self, hands:list) -> bytes:
+        # the OutcomeCache key of a deal, handKey() since these games play out exactly like Game's
+        return handKey(hands)
+
+    def playOut(self, p1cards:list, p2cards:list) -> GameResult:
+        """ Plays the game from the given hands, without consulting the cache. """
+        hand0 = deque(p1cards)
+        hand1 = deque(p2cards)
+        play0 = hand0.popleft
+        play1 = hand1.popleft
+        limit = self.round_limit
+        rounds = wars = longestWar = cycleLength = 0
+        winner = None
+        detector = CycleDetector((hand0, hand1)) if self.detect_cycles else None
+        cutoff = self.cutoff
+        if cutoff:
+            # atMost[v]: cards in the game with value v or lower. A short hand whose highest card is v holds every
+            # card of value v or lower exactly when its size is atMost[v], i.e. every card of the other hand beats
+            # every card of it: the position Analysis.decidedWinner() calls decided
+            atMost = [0] * 15
+            for value in p1cards + p2cards:
+                atMost[value] += 1
+            for value in range(1, 15):
+                atMost[value] += atMost[value - 1]
+            # so only hands of these sizes can be the losing side of a decided position ({4, 8} for a standard deck)
+            decidedSizes = {size for size in atMost if 0 < size <= CUTOFF_CARDS}
+
+        while hand0 and hand1 and rounds < limit:
+            rounds += 1
+            card0 = play0()
+            card1 = play1()
+            if card0 > card1:
+                hand0.append(card1)
+                hand0.append(card0)
+            elif card1 > card0:
+                hand1.append(card1)
+                hand1.append(card0)
+            else:
+                # Tie, keep playing single cards onto the table until someone wins the War or runs out of cards
+                tableCards = [card0, card1]
+                ties = 0
+                while card0 == card1:
+                    ties += 1
+                    if not hand0:
+                        winner = 1
+                        break
+                    card0 = play0()
+                    if not hand1:
+                        winner = 0
+                        break
+                    card1 = play1()
+                    tableCards.append(card0)
+                    tableCards.append(card1)
+                wars += 1
+                if ties > longestWar:
+                    longestWar = ties
+                if winner is not None:
+                    break
+                tableCards.reverse()
+                if card0 > card1:
+                    hand0.extend(tableCards)
+                else:
+                    hand1.extend(tableCards)
+            if detector is not None:
+                cycleLength = detector.check((hand0, hand1))
+                if cycleLength:
+                    break
+            if cutoff and (len(hand0) in decidedSizes or len(hand1) in decidedSizes) and hand0 and hand1:
+                short = hand0 if len(hand0) <= len(hand1) else hand1
+                if len(short) == atMost[max(short)] and rounds + len(short) <= limit:
+                    # the long hand wins every remaining round without a tie, and the short hand runs out first
+                    winner = 1 if short is hand0 else 0
+                    rounds += len(short)
+                    break
+
+        if winner is None and not (hand0 and hand1):
+            winner = 0 if hand0 else 1
+        return GameResult(winner, rounds, wars, longestWar, cycleLength)
+
+    def playGame(self) -> GameResult:
+        """ Deals a freshly shuffled deck and plays it out. """
+        return self.playHands(*dealValues(self.num_players, self.rng, self.decks))
+
+    def playSeed(self, seed:int) -> GameResult:
+        """
+        Plays the deal produced by a single 64 bit seed, the same deal Game(num_players, seed, decks=decks) plays.
+        """
+        return self.playHands(*dealValues(self.num_players, Random(seed), self.decks))
+
+    def iterGames(self, num_games:int):
+        """ Generator that plays num_games games, yielding each GameResult as soon as the game finishes. """
+        for game in range(num_games):
+            yield self.playGame()
+
+    def run(self, num_games:int) -> list:
+        """ Plays num_games games and returns the list of their GameResults. """
+        return list(self.iterGames(num_games))
@@ -0,0 +1,127 @@
+"""
+Runs large numbers of headless War games across all CPU cores.
+
+The requested games are split into shards, one per worker process. Every shard gets its own seed, drawn from a
+single master seed, so a tournament is reproducible from (seed, workers). Workers only send back their summed
+TournamentStats, never the individual games, so the parent does almost no work and throughput grows with the number
+of cores.
+
+Usage: python3 Tournament.py --games 100000 --seed 1234
+"""
+
+from Simulator import Simulator
+from collections import Counter
+from multiprocessing import Pool, cpu_count
+from random import Random
+import argparse
+
+
+class TournamentStats(object):
+    """
+    Running totals for a batch of 2 player games: wins per seat, games stopped by the round limit (draws), and the
+    distribution of round counts. Stats from different workers are combined with merge().
+    """
+    def __init__(self, num_seats:int = 2) -> None:
+        self.games = 0
+        self.wins = [0] * num_seats
+        self.draws = 0
+        self.cycles = 0  # draws that were stopped because the hands started repeating
+        self.wars = 0
+        self.roundCounts = Counter()  # number of rounds -> number of games that lasted that long
+
+    def add(self, result) -> None:
+        # records a single GameResult
+        self.games += 1
+        if result.winner is None:
+            self.draws += 1
+            if result.cycleLength:
+                self.cycles += 1
+        else:
+            self.wins[result.winner] += 1
+        self.wars += result.wars
+        self.roundCounts[result.rounds] += 1
+
+    def merge(self, other:"TournamentStats") -> "TournamentStats":
+        """ Adds the totals of other into these stats, and returns self so merges can be chained. """
+        self.games += other.games
+        self.wins = [mine + theirs for mine, theirs in zip(self.wins, other.wins)]
+        self.draws += other.draws
+        self.cycles += other.cycles
+        self.wars += other.wars
+        self.roundCounts.update(other.roundCounts)
+        return self
+
+    def winRates(self) -> list:
+        # fraction of all games won by each seat
+        return [wins / self.games if self.games else 0.0 for wins in self.wins]
+
+    def meanRounds(self) -> float:
+        if not self.games:
+            return 0.0
+        return sum(rounds * count for rounds, count in self.roundCounts.items()) / self.games
+
+    def report(self) -> str:
+        lines = ["Games played: {}".format(self.games)]
+        for seat, rate in enumerate(self.winRates()):
+            lines.append("  Player {} win rate: {:.4f}".format(seat, rate))
+        lines.append("  Draws: {} ({} repeating, {} at the round limit)".format(self.draws, self.cycles, self.draws - self.cycles))
+        lines.append("  Mean rounds per game: {:.1f}".format(self.meanRounds()))
+        return "\n".join(lines)
+
+
+def shardSeeds(seed:int, num_shards:int) -> list:
+    """ Derives one independent 64 bit seed per shard from the master seed. """
+    master = Random(seed)
+    return [master.getrandbits(64) for shard in range(num_shards)]
+
+
+def playShard(args:tuple) -> TournamentStats:
+    """ Worker entry point: plays num_games seeded games and returns only their summed stats. """
+    num_games, seed, round_limit, detect_cycles = args
+    sim = Simulator(round_limit=round_limit, rng=Random(seed), detect_cycles=detect_cycles)
+    stats = TournamentStats()
+    for result in sim.iterGames(num_games):
+        stats.add(result)
+    return stats
+
+
+class Tournament(object):
+    """
+    Shards num_games games across a process pool of num_workers (defaults to every core) and merges the results.
+    """
+    def __init__(self, num_workers:int = None, round_limit:int = 10000, detect_cycles:bool = False) -> None:
+        self.num_workers = num_workers or cpu_count()
+        self.round_limit = round_limit
+        self.detect_cycles = detect_cycles
+
+    def shards(self, num_games:int, seed:int) -> list:
+        # spreads the games as evenly as possible, the first (num_games % workers) shards get one extra game
+        base, extra = divmod(num_games, self.num_workers)
+        seeds = shardSeeds(seed, self.num_workers)
+        return [(base + (1 if idx < extra else 0), seeds[idx], self.round_limit, self.detect_cycles)
+                for idx in range(self.num_workers)]
+
+    def run(self, num_games:int, seed:int = 0) -> TournamentStats:
+        """ Plays num_games games and returns the merged TournamentStats. """
+        stats = TournamentStats()
+        shards = [shard for shard in self.shards(num_games, seed) if shard[0]]
+        if self.num_workers == 1:
+            for shard in shards:
+                stats.merge(playShard(shard))
+            return stats
+        with Pool(self.num_workers) as pool:
+            for shardStats in pool.imap_unordered(playShard, shards):
+                stats.merge(shardStats)
+        return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play many headless War games across all CPU cores.")
+    parser.add_argument("--games", type=int, default=10000, help="number of games to play")
+    parser.add_argument("--seed", type=int, default=0, help="master seed, every worker's seed is derived from it")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--round-limit", type=int, default=10000, help="rounds before a game is called a draw")
+    parser.add_argument("--detect-cycles", action="store_true", help="stop games as draws once their hands repeat")
+    args = parser.parse_args()
+
+    print(Tournament(args.workers, args.round_limit, args.detect_cycles).run(args.games, args.seed).report())
@@ -0,0 +1,234 @@
+"""
+NumPy engine that plays thousands of 2 player War games in lockstep. Requires NumPy (pip install numpy).
+
+Every game's state lives in flat arrays: each seat's hand is a ring buffer with running head and tail counters.
+Each pass of the loop plays a single turn of every game that is still running using whole-array operations, so the
+Python interpreter overhead is paid once per turn for all games instead of once per game. Ties (Wars), round limits
+and finished games are handled with masks, and finished games are compacted out of the state arrays so later turns
+only touch live games.
+
+A turn is bound by the cost of the gathers and scatters into the hands rather than by arithmetic, so the layout
+keeps them few and cheap:
+  - every live game plays a card from both seats every turn, so all the heads are at the same position: the number
+    of passes made. There is no head to keep per game, and the cards played in a turn are a single row of the rings
+  - the rings are stored slot major, a slot being 2 positions of a seat's hand: row k holds slot k of every game's
+    hands, the 2 seats of a game next to each other. One 4 byte read per game gets the top cards of both seats for
+    2 turns, and the 2 cards a Round's winner adds to their hand are written as one 2 byte slot
+  - the tail counters are 16 bit and wrap around along with the rings, so the arithmetic on them is cheap and only
+    the final positions are worked out in 64 bits
+  - the cards of a War are left where they were played, behind the heads, instead of being copied to a table every
+    turn. The winner of the War collects them from there (every turn but the last was a tie, so each of those turns
+    is the same card twice)
+
+The rules are the same as Game and Simulator, so playing the same deals gives the same GameResults.
+"""
+
+from GameResult import GameResult
+from Simulator import dealBatch
+import numpy as np
+
+# a slot of a seat's hand, the cards at 2 positions (first one in the low byte), and the slots of both seats of a game
+WORD = np.dtype("<u2")
+QUAD = np.dtype("<u4")
+
+
+class VectorEngine(object):
+    """
+    Plays batches of 2 player games as NumPy arrays. playDeals() plays the given starting hands, run() deals
+    num_games fresh games (same deals as Simulator for the same random.Random) and plays them all.
+    """
+    def __init__(self, round_limit:int = 10000) -> None:
+        self.round_limit = round_limit
+
+    def run(self, num_games:int, rng = None) -> list:
+        """
+        Deals num_games games with dealBatch() and plays them together, returns a list of GameResults. A NumPy
+        Generator deals all the games in one vectorized shuffle.
+        """
+        p1hands, p2hands = dealBatch(num_games, rng)
+        return self.playDeals(p1hands, p2hands)
+
+    def playDeals(self, p1hands:list, p2hands:list) -> list:
+        """
+        Plays one game per pair of starting hands (lists of card values, front of the list is the top of the hand)
+        and returns their GameResults in the same order.
+        """
+        numGames = len(p1hands)
+        if not numGames:
+            return []
+        sizes0 = np.fromiter(map(len, p1hands), dtype=np.int64, count=numGames)
+        sizes1 = np.fromiter(map(len, p2hands), dtype=np.int64, count=numGames)
+        total = int((sizes0 + sizes1).max())
+        # each seat's hand is a ring buffer of capacity cards, a power of 2 so positions wrap with a bitwise and.
+        # It holds at least 2 more than every card in the game, so there is always free space past a hand's tail,
+        # even with the cards of a War still behind the head
+        capacity = 1 << (total + 2 - 1).bit_length()
+        if capacity > 1 << 15:
+            raise ValueError("VectorEngine plays at most {} cards a game".format((1 << 15) - 2))
+        mask = np.uint16(capacity - 1)
+        # a tail only ever moves 2 cards at a time, so when every hand starts with an even number of cards (the
+        # usual case) the 2 cards a turn adds always fill a slot
+        evenTails = not ((sizes0 | sizes1) & 1).any()
+
+        # the rings are made of slots of 2 positions, stored slot major: row k holds slot k of every game's hands,
+        # the 2 seats of a game next to each other. Seat s's slot k in game g is words[k * rowWords + 2g + s], its
+        # card at position p is byte (p >> 1) * rowBytes + 4g + 2s + (p & 1) of hands, and both seats' slots are
+        # quads[k * stride + g]. A row is padded to an odd number of cache lines, so the rows a turn touches don't
+        # all compete for the same cache sets
+        stride = np.int64(16 * (numGames // 16 + 1 | 1))
+        rowBytes = 4 * stride
+        rowWords = 2 * stride
+        hands = np.zeros(capacity // 2 * rowBytes, dtype=np.uint8)
+        words = hands.view(WORD)
+        quads = hands.view(QUAD)
+        slots = words.reshape(capacity // 2, stride, 2)
+        if sizes0.min() == sizes0.max() and sizes1.min() == sizes1.max():
+            # every game was dealt the same hand sizes (the usual case), load them all at once
+            for seat, size, dealt in ((0, sizes0[0], p1hands), (1, sizes1[0], p2hands)):
+                cards = np.zeros((numGames, size + (size & 1)), dtype=np.uint8)
+                cards[:, :size] = np.frombuffer(b"".join(map(bytes, dealt)), dtype=np.uint8).reshape(numGames, size)
+                slots[:cards.shape[1] // 2, :numGames, seat] = cards.view(WORD).T
+        else:
+            for game in range(numGames):
+                for seat, dealt in ((0, p1hands[game]), (1, p2hands[game])):
+                    cards = bytes(dealt) + bytes(len(dealt) & 1)
+                    slots[:len(cards) // 2, game, seat] = np.frombuffer(cards, dtype=WORD)
+
+        # per game results, filled in as games finish (wars and longestWar as the Wars are settled). A game has
+        # played one turn every pass, extra counts its turns that didn't start a Round (the turns of its Wars)
+        winner = np.full(numGames, -1, dtype=np.int64)
+        rounds = np.zeros(numGames, dtype=np.int64)
+        wars = np.zeros(numGames, dtype=np.int64)
+        longestWar = np.zeros(numGames, dtype=np.int64)
+        extra = np.zeros(numGames, dtype=np.int64)
+
+        # state of the live games, compacted whenever games finish. game holds each live game's index, and column
+        # the index of its seat 0 slots in a row of words. tails are running counters of the cards added to each
+        # seat's hand (played counts the cards played from both), warTurns counts the ties in the Round in progress
+        # (the turns its War has played so far) and war lists the games in a War, which are the ones whose last turn
+        # was a tie
+        game = np.arange(numGames)
+        column = 2 * game
+        tails = np.stack((sizes0, sizes1)).astype(np.uint16)
+        warTurns = np.zeros(numGames, dtype=np.uint16)
+        war = np.zeros(0, dtype=np.int64)
+        # for collecting the cards of a War: the positions of its ties, 2, 3, ... cards behind a head, and the
+        # positions past a tail they go to
+        back = np.arange(2, total + 2)
+        ahead = 2 * np.arange(total)
+        limit = self.round_limit
+        played = 0
+        cards = np.zeros((4, numGames), dtype=np.uint8)
+
+        while True:
+            # a new Round ends the game if a hand is empty (checkWin) or the round limit is reached.
+            # During a War, seat 0 plays first, so seat 0 running out loses before seat 1's hand is checked.
+            # No game can be at the round limit before the loop has made that many passes
+            head = np.uint16(played & 0xFFFF)
+            tail0, tail1 = tails
+            empty0 = tail0 == head
+            outOfCards = empty0 | (tail1 == head)
+            if played >= limit:
+                finished = outOfCards | ((played - extra[game] >= limit) & (warTurns == 0))
+            else:
+                finished = outOfCards
+            if finished.any():
+                done = game[finished]
+                winner[done] = np.where(outOfCards[finished], np.where(empty0[finished], 1, 0), -1)
+                # a War cut short by a hand running out still counts, but its last tie didn't start a Round
+                ties = warTurns[finished].astype(np.int64)
+                rounds[done] = played - extra[done] - np.maximum(ties - 1, 0)
+                wars[done] += ties > 0
+                np.maximum(longestWar[done], ties, out=ties)
+                longestWar[done] = ties
+                keep = ~finished
+                game, column, tails, warTurns = game[keep], column[keep], tails.compress(keep, axis=1), warTurns[keep]
+                cards = cards.compress(keep, axis=1)
+                war = np.flatnonzero(warTurns)
+                if not game.size:
+                    break
+                tail0, tail1 = tails
+            # both seats play the top card of their hand, which is in the same row for every game. A turn at the
+            # first position of a slot reads both seats' slots, and the next turn plays the second cards of the same
+            # slots: the cards added in between go past the tails, which are in later slots when they stay even
+            first = played & 1
+            if not first or not evenTails:
+                start = ((played & capacity - 1) >> 1) * stride
+                cards = quads[start:start + stride].take(game).view(np.uint8).reshape(-1, 4).T.copy()
+            card0 = cards[first]
+            card1 = cards[first + 2]
+            played += 1
+            win1 = card1 > card0
+            tie = card0 == card1
+
+            # common case, a Round settled by a single turn: the winner puts the 2 cards on the end of their hand,
+            # reversed. Selection is done with arithmetic rather than masks, which is much faster on random data.
+            # Every game writes the 2 cards past the tail of the hand with the higher card and moves that tail over
+            # them, which is also right for a War that was just won (its last turn is the first collected); only
+            # the ties move seat 0's tail back below
+            seat = win1.astype(np.uint16)
+            row = tail1 - tail0
+            row *= seat
+            row += tail0
+            if evenTails:
+                row &= mask
+                row >>= 1
+                dst = row * rowWords
+                dst += seat
+                dst += column
+                slot = card0.astype(WORD)
+                slot <<= 8
+                slot |= card1
+                words[dst] = slot
+            else:
+                position = column + seat
+                position *= 2
+                row &= mask
+                hands[(row >> 1) * rowBytes + (row & 1) + position] = card1
+                row += 1
+                row &= mask
+                hands[(row >> 1) * rowBytes + (row & 1) + position] = card0
+            seat <<= 1
+            tail1 += seat
+            tail0 += 2
+            tail0 -= seat
+
+            # Wars: the cards stay behind the heads until the tie is broken, then the winner collects them reversed
+            settled = war[~tie[war]]
+            war = np.flatnonzero(tie)
+            tail0[war] -= 2
+            warTurns[war] += 1
+            if settled.size:
+                ties = warTurns[settled]
+                turns = int(ties.max())
+                seat = win1[settled].astype(np.intp)
+                # the ties of the War, latest first
+                src = (played - back[:turns]) & mask
+                collected = hands.take((src >> 1) * rowBytes + (src & 1) + 2 * column[settled, None])
+                tail = tails[seat, settled]
+                position = column[settled] + seat
+                dst = tail[:, None] + ahead[:turns]
+                if ties.min() < turns:
+                    valid = ahead[:turns] < 2 * ties[:, None]
+                    collected, dst, position = collected[valid], dst[valid], position.repeat(ties)
+                else:
+                    position = position[:, None]
+                dst &= mask
+                if evenTails:
+                    # a tie's 2 cards fill a slot
+                    words[(dst >> 1) * rowWords + position] = collected.astype(WORD) * 257
+                else:
+                    position = 2 * position
+                    hands[(dst >> 1) * rowBytes + (dst & 1) + position] = collected
+                    dst += 1
+                    dst &= mask
+                    hands[(dst >> 1) * rowBytes + (dst & 1) + position] = collected
+                tails[seat, settled] = tail + 2 * ties
+                warTurns[settled] = 0
+                settled = game[settled]
+                extra[settled] += ties
+                wars[settled] += 1
+                longestWar[settled] = np.maximum(longestWar[settled], ties)
+
+        return list(map(GameResult, [None if win < 0 else win for win in winner.tolist()], rounds.tolist(), wars.tolist(),
+                        longestWar.tolist()))
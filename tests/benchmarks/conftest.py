@@ -0,0 +1,62 @@
+"""
+Regression check for the benchmarks: compares each benchmark's throughput with tests/benchmarks/baseline.json.
+
+Baselines are only comparable on the machine and Python they were recorded with, so each one stores the Python
+version it came from, and a run on a different Python (or a benchmark without a baseline) isn't compared.
+"""
+
+import json
+import os
+import platform
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def pythonVersion() -> str:
+    return "{} {}".format(platform.python_implementation(), ".".join(platform.python_version_tuple()[:2]))
+
+
+def loadBaselines() -> dict:
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH) as file:
+        return json.load(file)
+
+
+@pytest.fixture(scope="session")
+def baselines(request):
+    stored = loadBaselines()
+    yield stored
+    if request.config.getoption("--update-baseline"):
+        with open(BASELINE_PATH, "w") as file:
+            json.dump(stored, file, indent=2, sort_keys=True)
+            file.write("\n")
+
+
+@pytest.fixture
+def checkBaseline(request, benchmark, baselines):
+    """
+    Call after running benchmark(...): records the throughput with --update-baseline, otherwise fails the test if
+    it is more than --regression-threshold below the stored baseline.
+    """
+    def check():
+        if benchmark.disabled or benchmark.stats is None:
+            return  # --benchmark-disable runs the code once without timing it
+        ops = 1 / benchmark.stats.stats.median  # the median is much less sensitive to outliers than the mean
+        name = request.node.name
+        if request.config.getoption("--update-baseline"):
+            baselines[name] = {"ops": round(ops, 3), "python": pythonVersion()}
+            return
+        stored = baselines.get(name)
+        if stored is None or stored["python"] != pythonVersion():
+            return  # nothing comparable recorded yet
+        threshold = request.config.getoption("--regression-threshold")
+        floor = stored["ops"] * (1 - threshold)
+        if ops < floor:
+            pytest.fail("{} ran at {:,.1f} ops/s, more than {:.0%} below the baseline of {:,.1f} ops/s".format(
+                name, ops, threshold, stored["ops"]))
+    return check
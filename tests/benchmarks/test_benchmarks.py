@@ -0,0 +1,65 @@
+"""
+Throughput benchmarks for the hot paths, on fixed seeds so runs are comparable. Each benchmark is compared with its
+stored baseline by the checkBaseline fixture (see conftest.py). They are skipped unless asked for; run only these with:
+    python -m pytest tests/benchmarks --benchmarks --benchmark-only
+"""
+
+from random import Random
+
+from Card import Card
+from Deck import Deck
+from Events import NullSink
+from Game import Game
+from Player import Player
+from Simulator import Simulator
+
+ROUNDS = 2000  # round limit for full games, most deals never end on their own
+
+
+def test_deck_shuffle(benchmark, checkBaseline):
+    deck = Deck(seed=1)
+    benchmark(deck.shuffle)
+    checkBaseline()
+
+
+def test_deck_split(benchmark, checkBaseline):
+    def dealFresh():
+        return Deck(seed=1).splitDeck(2)
+    splits = benchmark(dealFresh)
+    assert [len(split) for split in splits] == [26, 26]
+    checkBaseline()
+
+
+def test_player_play_and_collect(benchmark, checkBaseline):
+    player = Player(0, [Card.fromCode(code) for code in range(52)])
+    def cycleHand():
+        # play the whole hand two cards at a time and collect each pair back
+        for turn in range(26):
+            player.collectCards([player.playCard(), player.playCard()])
+    benchmark(cycleHand)
+    assert player.handCount() == 52
+    checkBaseline()
+
+
+def test_game_play(benchmark, checkBaseline):
+    def playSeeded():
+        return Game(seed=202, sink=NullSink()).play(round_limit=ROUNDS)
+    result = benchmark(playSeeded)
+    assert result.winner == 0
+    checkBaseline()
+
+
+def test_game_play_looping_deal(benchmark, checkBaseline):
+    def playSeeded():
+        return Game(seed=0, sink=NullSink()).play(round_limit=ROUNDS)
+    result = benchmark(playSeeded)
+    assert result.rounds == ROUNDS
+    checkBaseline()
+
+
+def test_simulator_games(benchmark, checkBaseline):
+    def playBatch():
+        return Simulator(round_limit=ROUNDS, rng=Random(0)).run(20)
+    results = benchmark(playBatch)
+    assert len(results) == 20
+    checkBaseline()
@@ -0,0 +1,39 @@
+"""
+Shared test setup. The modules live at the top of the repository (there is no package), so the repository root is
+put on sys.path for every test.
+
+Benchmarks (tests/benchmarks, they need pytest-benchmark) are opt-in: their baselines are absolute throughputs that
+only hold on the machine they were recorded on, so a plain run skips them. With --benchmarks they run and are checked
+against the stored throughput in tests/benchmarks/baseline.json: a benchmark fails when its operations per second
+drop more than --regression-threshold (default 20%) below the baseline. Run with --update-baseline (which implies
+--benchmarks) to record new baselines, e.g. after an intentional change or on a different machine.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("war baselines")
+    group.addoption("--benchmarks", action="store_true",
+                    help="run the benchmarks in tests/benchmarks and compare them with their baselines")
+    group.addoption("--regression-threshold", type=float, default=0.2,
+                    help="fail a benchmark whose throughput is this fraction below its baseline (default 0.2)")
+    group.addoption("--update-baseline", action="store_true",
+                    help="store this run's benchmark throughput as the new baseline instead of comparing")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmarks") or config.getoption("--update-baseline"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks only run with --benchmarks")
+    benchmarks = os.path.join(ROOT, "tests", "benchmarks") + os.sep
+    for item in items:
+        if str(item.fspath).startswith(benchmarks):
+            item.add_marker(skip)
@@ -0,0 +1,70 @@
+"""
+Streaming statistics must agree with statistics computed from every value at once, however they are split and merged.
+"""
+
+from random import Random
+import statistics
+
+import pytest
+
+from Aggregator import Histogram, ResultAggregator, RunningStats, aggregateGames
+from Game import Game
+from Simulator import Simulator
+
+
+def test_running_stats_merge_matches_the_whole_stream():
+    rng = Random(8)
+    values = [rng.randint(0, 10000) for value in range(3000)]
+    first, second = RunningStats(), RunningStats()
+    for value in values[:1000]:
+        first.add(value)
+    for value in values[1000:]:
+        second.add(value)
+    first.merge(second)
+    assert first.count == len(values)
+    assert abs(first.mean - statistics.mean(values)) < 1e-6
+    assert abs(first.variance() / statistics.variance(values) - 1) < 1e-9
+    assert (first.minimum, first.maximum) == (min(values), max(values))
+
+
+def test_histogram_buckets_and_quantiles():
+    for value in range(100000):
+        low, high = Histogram.bounds(Histogram.bucket(value))
+        assert low <= value <= high
+        assert high - low <= max(1, value // 32)
+    histogram = Histogram()
+    for value in range(1, 10001):
+        histogram.add(value)
+    assert abs(histogram.quantile(0.5) - 5000) < 5000 / 32
+    assert len(histogram.counts) < 400
+
+
+def test_aggregator_as_a_game_sink():
+    aggregator = ResultAggregator()
+    game = Game(sink=aggregator)
+    results = []
+    for seed in range(5):
+        game.reset(seed)
+        results.append(game.run(round_limit=300))
+    assert aggregator.games == 5
+    assert aggregator.rounds.maximum == max(result.rounds for result in results)
+
+
+def test_checkpoint_and_resume(tmp_path):
+    path = str(tmp_path / "run.json")
+    whole = aggregateGames(600, seed=2, num_workers=1, round_limit=500, every=200)
+    aggregateGames(400, seed=2, num_workers=1, round_limit=500, path=path, every=200)
+    assert ResultAggregator.load(path).games == 400
+    resumed = aggregateGames(600, seed=2, num_workers=1, round_limit=500, path=path, every=200)
+    assert resumed.toDict() == whole.toDict()
+    # a checkpoint of other games can't be resumed
+    for changed in ({"seed": 3}, {"num_workers": 2}, {"round_limit": 400}, {"detect_cycles": True}, {"every": 100}):
+        settings = dict(seed=2, num_workers=1, round_limit=500, every=200)
+        settings.update(changed)
+        with pytest.raises(ValueError):
+            aggregateGames(800, path=path, **settings)
+    assert ResultAggregator.load(path).games == 600
+
+    aggregator = ResultAggregator().consume(Simulator(round_limit=500, rng=Random(1)).iterGames(50), path, every=20)
+    assert ResultAggregator.load(path).games == 40
+    assert aggregator.games == 50
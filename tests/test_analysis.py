@@ -0,0 +1,49 @@
+"""
+Analysis estimates outcomes; the cutoff it describes must never change a result.
+"""
+
+from random import Random
+
+from Analysis import OutcomeEstimator, balanceShards, decidedWinner
+from Simulator import Simulator, dealValues
+
+
+def test_decided_winner():
+    assert decidedWinner(([10, 12, 14], [2, 3])) == (0, 2)
+    assert decidedWinner(([2, 3], [10, 12])) == (1, 2)
+    # the stronger hand is shorter: it could run out of cards before the weaker one does
+    assert decidedWinner(([14], [2, 3])) is None
+    assert decidedWinner(([5, 9], [7, 8])) is None
+
+
+def test_cutoff_gives_the_same_results():
+    rng = Random(5)
+    full = Simulator(round_limit=3000, detect_cycles=True)
+    cut = Simulator(round_limit=3000, detect_cycles=True, cutoff=True)
+    for game in range(200):
+        hands = dealValues(2, rng)
+        assert cut.playHands(*hands) == full.playHands(*hands)
+    # small hands reach decided positions quickly
+    for game in range(2000):
+        values = [rng.randint(2, 14) for card in range(rng.randint(2, 10))]
+        split = rng.randint(1, len(values) - 1)
+        hands = (values[:split], values[split:])
+        assert cut.playHands(*hands) == full.playHands(*hands)
+
+
+def test_estimator(tmp_path):
+    estimator = OutcomeEstimator(round_limit=2000).calibrate(200, Random(1))
+    hands = dealValues(2, Random(2))
+    estimate = estimator.estimate(hands)
+    assert abs(sum(estimate.winProbs) + estimate.drawProb - 1) < 1e-9
+    assert 0 < estimate.rounds <= 2000
+
+    path = str(tmp_path / "estimator.json")
+    estimator.save(path)
+    loaded = OutcomeEstimator.load(path)
+    assert loaded.estimate(hands).rounds == estimate.rounds
+
+    deals = [dealValues(2, Random(seed)) for seed in range(12)]
+    shards = balanceShards(deals, 3, estimator)
+    assert len(shards) == 3
+    assert sorted(hands for shard in shards for hands in shard) == sorted(deals)
@@ -0,0 +1,52 @@
+import pytest
+
+from Card import CARDS, Card
+from Deck import Deck
+
+
+def test_deck_has_every_card_once():
+    deck = Deck(seed=1)
+    assert sorted(card.code() for card in deck.card_list) == list(range(52))
+    assert len(deck) == 52
+
+
+def test_same_seed_same_deck():
+    assert Deck(seed=42).card_list == Deck(seed=42).card_list
+    assert Deck(seed=42).card_list != Deck(seed=43).card_list
+
+
+def test_lazy_draws_match_a_full_shuffle():
+    lazy = Deck(seed=9, decks=2)
+    shuffled = Deck(seed=9, decks=2)
+    shuffled.shuffle()
+    assert [lazy.drawSingle() for draw in range(105)] == [shuffled.drawSingle() for draw in range(105)]
+
+
+def test_split_deals_in_rotation_from_the_top():
+    deck = Deck(seed=3)
+    top = deck.card_list[::-1]
+    splits = deck.splitDeck(3)
+    assert [len(split) for split in splits] == [18, 17, 17]
+    assert splits[0][:2] == [top[0], top[3]]
+    assert splits[2][0] == top[2]
+    assert deck.drawSingle() is False
+
+
+def test_shoe_of_several_decks():
+    deck = Deck(seed=5, decks=4)
+    codes = sorted(card.code() for card in deck.card_list)
+    assert codes == sorted(list(range(52)) * 4)
+    assert all(split and len(split) == 26 for split in deck.splitDeck(8))
+
+
+def test_cards_are_shared_flyweights():
+    assert Card.fromCode(51) is CARDS[51]
+    assert Card("Spades", 14).code() == 51
+    assert Card("Spades", 14).show() == "Ace of Spades"
+
+
+def test_a_shoe_needs_at_least_one_deck():
+    assert len(Deck(seed=1, decks=3)) == 156
+    for decks in (0, -3):
+        with pytest.raises(ValueError):
+            Deck(decks=decks)
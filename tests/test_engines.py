@@ -0,0 +1,100 @@
+"""
+The headless engines play by the same rules as Game, so for the same deal they must produce the same results.
+"""
+
+from random import Random
+
+import pytest
+
+from CycleDetector import CycleDetector
+from Events import NullSink
+from Game import Game
+from MultiSimulator import MultiSimulator
+from OutcomeCache import OutcomeCache, handKey
+from Simulator import Simulator, dealValues
+
+
+def test_multi_simulator_with_two_seats_matches_simulator():
+    simulator = Simulator(round_limit=2000)
+    multi = MultiSimulator(2, round_limit=2000)
+    for seed in range(200):
+        assert multi.playSeed(seed) == simulator.playSeed(seed)
+
+
+def test_multi_way_tie_is_settled_by_the_tied_seats():
+    # seats 0 and 2 tie on 9 and seat 1's 5 stays on the table; seat 2 wins the War with a King over a 2 and collects
+    # all 5 cards, leaving seats 0 and 1 empty
+    result = MultiSimulator(3).playHands([9, 2], [5], [9, 13])
+    assert (result.winner, result.rounds, result.wars, result.longestWar) == (2, 1, 1, 1)
+
+    # with cards left over, the rest of the game must play out exactly like a game dealt the hands after round 1:
+    # seat 0 [4], seat 1 [3, 6] and seat 2 [7, 8] plus the table reversed (13, 2, 9, 5, 9)
+    full = MultiSimulator(3).playHands([9, 2, 4], [5, 3, 6], [9, 13, 7, 8])
+    rest = MultiSimulator(3).playHands([4], [3, 6], [7, 8, 13, 2, 9, 5, 9])
+    assert full.winner == rest.winner == 2
+    assert full.rounds == rest.rounds + 1
+    assert full.wars == rest.wars + 1
+
+
+def test_everyone_in_a_war_running_out():
+    # seats 0 and 1 tie and both run out: seat 2 is left as the winner
+    result = MultiSimulator(3).playHands([5], [5], [3, 3])
+    assert result.winner == 2
+
+
+def test_cycle_detector_finds_a_repeating_state():
+    # the hands alternate between two states forever, a cycle of length 2
+    states = [([2, 3], [4]), ([4], [2, 3])]
+    detector = CycleDetector(states[0])
+    found = [detector.check(states[step % 2]) for step in range(1, 9)]
+    assert [length for length in found if length][0] == 2
+
+
+def test_cache_returns_stored_results():
+    cache = OutcomeCache()
+    simulator = Simulator(round_limit=5000, cache=cache, detect_cycles=True)
+    # this deal repeats after 179 rounds, a draw that is cached since cycles are being detected
+    hands = dealValues(2, Random(5))
+    first = simulator.playHands(*hands)
+    assert first.winner is None and first.cycleLength == 52
+    assert cache.get(handKey(hands)) == first
+    assert simulator.playHands(*hands) is cache.get(handKey(hands))
+    # a finished game is cached too
+    won = simulator.playHands([14, 13], [2, 3])
+    assert won.winner == 0
+    assert cache.get(handKey([[14, 13], [2, 3]])) == won
+
+
+def test_vector_engine_matches_simulator():
+    pytest.importorskip("numpy")
+    from VectorEngine import VectorEngine
+    rng = Random(3)
+    deals = [dealValues(2, rng) for game in range(300)]
+    vector = VectorEngine(round_limit=1000).playDeals([deal[0] for deal in deals], [deal[1] for deal in deals])
+    simulator = Simulator(round_limit=1000)
+    assert list(vector) == [simulator.playHands(*deal) for deal in deals]
+
+
+def test_vector_engine_matches_simulator_on_uneven_hands():
+    # odd and unequal hand sizes, and few card values so that there are plenty of long Wars
+    pytest.importorskip("numpy")
+    from VectorEngine import VectorEngine
+    rng = Random(1)
+    deals = [([rng.randint(2, 4) for card in range(rng.randint(1, 30))], [rng.randint(2, 4) for card in range(rng.randint(1, 30))])
+             for game in range(300)]
+    vector = VectorEngine(round_limit=300).playDeals([deal[0] for deal in deals], [deal[1] for deal in deals])
+    simulator = Simulator(round_limit=300)
+    assert list(vector) == [simulator.playHands(*deal) for deal in deals]
+    assert any(result.longestWar > 2 for result in vector)
+
+
+def test_multi_simulator_keeps_its_own_cache_entries():
+    # with 3 seats Game and MultiSimulator play different games: Game's deal 3 repeats after 1075 rounds, while
+    # MultiSimulator's runs to the round limit, so it must not be handed Game's cached draw
+    cache = OutcomeCache()
+    Game(3, seed=3, sink=NullSink(), cache=cache).run(round_limit=3000, detect_cycles=True)
+    shared = MultiSimulator(3, round_limit=3000, cache=cache, detect_cycles=True).playSeed(3)
+    assert shared == MultiSimulator(3, round_limit=3000, detect_cycles=True).playSeed(3)
+    assert shared.rounds == 3000
+    # 2 seat games are the same in every engine, and still share their results
+    assert MultiSimulator(2, cache=cache).cacheKey([[2], [3]]) == Simulator(cache=cache).cacheKey([[2], [3]])
@@ -0,0 +1,45 @@
+"""
+The Explorer's memoized outcomes must agree with playing every game out in full.
+"""
+
+from collections import Counter
+from random import Random
+
+from Explorer import Explorer, countDeals, deckValues, distinctOrders, explore, splitOrder
+from Simulator import Simulator
+
+
+def test_distinct_orders_of_a_small_deck():
+    orders = list(distinctOrders(Counter(deckValues(2, 4))))
+    assert len(orders) == countDeals(2, 4) == 70
+    assert len(set(orders)) == 70
+
+
+def test_memoized_outcomes_match_the_simulator():
+    explorer = Explorer()
+    simulator = Simulator(round_limit=100000, detect_cycles=True)
+    for order in distinctOrders(Counter(deckValues(3, 2))):
+        hands = splitOrder(order)
+        result = explorer.outcome(*hands)
+        expected = simulator.playHands(*hands)
+        if expected.winner is None:
+            assert result.winner is None
+            assert result.cycleLength == expected.cycleLength
+        else:
+            assert result == expected
+    # a fresh Explorer plays the game out itself, and must get the same result as the shared memo table
+    rng = Random(4)
+    for game in range(50):
+        order = deckValues(4, 4)
+        rng.shuffle(order)
+        assert Explorer().outcome(*splitOrder(order)) == explorer.outcome(*splitOrder(order))
+
+
+def test_explore_covers_every_deal():
+    stats = explore(2, 4, num_workers=1)
+    assert stats.exhaustive()
+    assert stats.games == 70
+    assert sum(stats.wins) + stats.draws == 70
+    assert len(stats.cyclingDeals) == stats.draws == sum(stats.cycleLengths.values())
+    sampled = explore(3, 4, num_workers=1, num_samples=200, seed=1)
+    assert sampled.games == 200 and not sampled.exhaustive()
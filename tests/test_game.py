@@ -0,0 +1,100 @@
+"""
+Game rules and the corner cases documented in the README (and in the sample test cases at the end of Game.py).
+"""
+
+import pytest
+
+from Card import Card
+from Events import NullSink
+from Game import Game
+from Simulator import Simulator
+
+
+def aces_and_kings():
+    # four Aces and two Kings, the start of every sample hand in Game.py
+    return [Card("Clubs", 14), Card("Hearts", 14), Card("Spades", 14), Card("Diamonds", 14), Card("Clubs", 13), Card("Hearts", 13)]
+
+
+def play(p1cards, p2cards, **kwargs):
+    game = Game(sink=NullSink())
+    result = game.play(custom_test=True, p1cards=p1cards, p2cards=p2cards, **kwargs)
+    return game, result
+
+
+def test_war_tie_awards_the_whole_table():
+    # TEST CASE 1: five tied turns, then King beats 3 and Player 0 collects all 12 cards
+    p2cards = aces_and_kings()[:5] + [Card("Hearts", 3)]
+    game, result = play(aces_and_kings(), p2cards)
+    assert result.winner == 0
+    assert result.rounds == 1
+    assert result.wars == 1
+    assert result.longestWar == 5
+    assert game.seats[0].handCount() == 12
+    assert game.seats[1].handCount() == 0
+
+
+def test_running_out_of_cards_in_a_war_loses_immediately():
+    # TEST CASE 2: Player 1 runs out during the War and loses in the first round
+    game, result = play(aces_and_kings(), aces_and_kings()[:5])
+    assert result.winner == 0
+    assert result.rounds == 1
+    assert result.longestWar == 5
+    assert game.over
+
+
+def test_uneven_hands_play_to_a_winner():
+    # TEST CASE 3: Player 1 starts with more cards but loses after a few rounds
+    p2cards = aces_and_kings()[:5] + [Card("Hearts", 2), Card("Hearts", 3)]
+    game, result = play(aces_and_kings(), p2cards)
+    assert result.winner == 0
+    assert result.rounds == 4
+    assert game.seats[1].handCount() == 0
+
+
+def test_winner_collects_the_table_reversed():
+    game, result = play([Card("Clubs", 9), Card("Clubs", 2)], [Card("Hearts", 5), Card("Hearts", 3)], round_limit=1)
+    assert result.winner is None  # stopped by the round limit
+    assert [card.val for card in game.seats[0].hand] == [2, 5, 9]
+
+
+def test_seeded_games_are_reproducible_and_match_the_simulator():
+    first = Game(seed=202, sink=NullSink()).run(round_limit=2000)
+    second = Game(seed=202, sink=NullSink()).run(round_limit=2000)
+    assert first == second
+    expected = Simulator(round_limit=2000).playSeed(202)
+    assert (first.winner, first.rounds, first.wars, first.longestWar) == (expected.winner, expected.rounds, expected.wars, expected.longestWar)
+
+
+def test_reset_reuses_the_game():
+    game = Game(sink=NullSink())
+    results = []
+    for seed in (1, 2, 1):
+        game.reset(seed)
+        results.append(game.run(round_limit=500))
+    assert results[0] == results[2]
+    seats = list(game.seats)
+    game.reset(3)
+    assert game.players == seats and all(new is old for new, old in zip(game.seats, seats))
+    assert all(p.handCount() == 0 for p in game.players)
+    assert game.losers == [] and game.tableCards == []
+    assert (game.rounds, game.wars, game.longestWar, game.roundTies, game.cycleLength) == (0, 0, 0, 0, 0)
+    assert game.winner is None and not game.over and game.seed == 3
+
+
+def test_detect_cycles_ends_a_looping_game_as_a_draw():
+    result = Game(seed=0, sink=NullSink()).run(detect_cycles=True)
+    assert result.winner is None
+    assert result.cycleLength == 159200
+
+
+def test_step_by_step_matches_run():
+    game = Game(seed=7, sink=NullSink())
+    game.start(round_limit=300)
+    while game.playRound():
+        pass
+    assert game.finish() == Game(seed=7, sink=NullSink()).run(round_limit=300)
+
+
+def test_a_game_without_players_is_refused():
+    with pytest.raises(ValueError):
+        Game(0, sink=NullSink()).start()
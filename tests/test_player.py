@@ -0,0 +1,29 @@
+from Card import Card
+from Player import Player
+
+
+def test_players_never_share_a_hand():
+    # the old mutable default argument made every Player created without a hand share one list
+    first = Player(0)
+    second = Player(1)
+    first.collectCards([Card("Clubs", 2)])
+    assert second.handCount() == 0
+
+
+def test_play_from_the_top_collect_onto_the_bottom():
+    player = Player(0, [Card("Clubs", 2), Card("Clubs", 3)])
+    player.collectCards([Card("Hearts", 4), Card("Hearts", 5)])
+    assert [player.playCard().val for card in range(4)] == [2, 3, 5, 4]
+    assert player.playCard() is False
+
+
+def test_collect_without_reversing():
+    player = Player(0)
+    player.collectCards([Card("Hearts", 4), Card("Hearts", 5)], reverse=False)
+    assert [card.val for card in player.hand] == [4, 5]
+
+
+def test_display_hand_returns_lines(capsys):
+    player = Player(0, [Card("Clubs", 2), Card("Hearts", 14)])
+    assert player.displayHand() == ["Player 0's hand: ", "2 of Clubs", "Ace of Hearts"]
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,68 @@
+"""
+A Profiler only watches: a profiled game plays and reports exactly like an unprofiled one, and its timings add up.
+"""
+
+import io
+
+from Events import JsonLinesSink
+from Game import Game
+from Profiler import Profiler
+
+
+def playLogged(seed:int, profiler:Profiler = None) -> tuple:
+    # plays a seeded game into a JSON lines log, returns its result and the log
+    log = io.StringIO()
+    game = Game(seed=seed, sink=JsonLinesSink(log))
+    if profiler is not None:
+        profiler.attach(game)
+    result = game.run(round_limit=300, detect_cycles=True)
+    return result, log.getvalue()
+
+
+def test_profiled_game_plays_the_same():
+    profiler = Profiler()
+    assert playLogged(7, profiler) == playLogged(7)
+    assert profiler.counters["events: round-start"] == 300
+
+
+def test_phase_paths_in_collapsed_output(tmp_path):
+    profiler = Profiler()
+    result, log = playLogged(7, profiler)
+    assert result.wars
+    paths = [line.rsplit(" ", 1)[0] for line in profiler.collapsed().splitlines()]
+    for path in ("deal", "deal;collect", "round", "round;turn", "round;turn;events", "round;war", "round;collect",
+                 "round;cycles", "round;end"):
+        assert path in paths
+    assert profiler.calls["round"] == result.rounds + 1  # the last call finds the round limit reached
+    assert profiler.calls["round;war"] == sum(1 for line in log.splitlines() if '"event":"war"' in line)
+    path = str(tmp_path / "stacks.txt")
+    profiler.writeCollapsed(path)
+    with open(path) as file:
+        assert file.read() == profiler.collapsed()
+
+
+def test_self_times_add_up_to_the_total():
+    profiler = Profiler()
+    playLogged(3, profiler)
+    for path, selfTime in profiler.selfTimes.items():
+        assert 0 <= selfTime <= profiler.totals[path]
+    # every nanosecond is some phase's self time, so the self times add up to the time spent in the outermost phases
+    outermost = sum(total for path, total in profiler.totals.items() if ";" not in path)
+    assert sum(profiler.selfTimes.values()) == outermost
+
+
+def test_nested_phases_with_a_fake_clock():
+    ticks = iter([0, 10000, 25000, 40000, 50000, 53000])
+    profiler = Profiler(clock=lambda: next(ticks))
+    profiler.enter("round")
+    profiler.enter("turn")
+    profiler.exit()
+    profiler.exit()
+    profiler.timed("deal", lambda: None)()
+    assert dict(profiler.totals) == {"round": 40000, "round;turn": 15000, "deal": 3000}
+    assert dict(profiler.selfTimes) == {"round": 25000, "round;turn": 15000, "deal": 3000}
+    assert profiler.collapsed() == "deal 3\nround 25\nround;turn 15\n"
+    report = profiler.report().splitlines()
+    # slowest self time first
+    assert [line.split()[0] for line in report[1:]] == ["round", "round;turn", "deal"]
+    assert report[1].split()[1:5] == ["1", "0.04", "0.03", "58.1%"]
@@ -0,0 +1,79 @@
+"""
+A replay file must give back exactly the games that were written to it, round by round.
+"""
+
+import pytest
+
+from Events import NullSink
+from Game import Game
+from OutcomeCache import OutcomeCache
+from Replay import ReplayReader, ReplayWriter
+from Rules import Rules
+
+
+def playRecorded(game:Game, seed:int, round_limit:int) -> list:
+    # plays a game round by round, returning every seat's hand (Card codes) after each round, 0 being the deal
+    game.reset(seed)
+    game.start(round_limit=round_limit)
+    states = [[[card.code() for card in p.hand] for p in game.seats]]
+    while game.playRound():
+        states.append([[card.code() for card in p.hand] for p in game.seats])
+    game.finish()
+    return states
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "games.war")
+    played = []
+    with ReplayWriter(path) as writer:
+        for num_players, seed in ((2, 1), (2, 202), (2, 5), (2, 7)):
+            game = Game(num_players, sink=writer)
+            states = playRecorded(game, seed, 300)
+            played.append((game.result(), states))
+
+    with ReplayReader(path) as reader:
+        assert len(reader) == len(played)
+        for n, (result, states) in enumerate(played):
+            replay = reader.game(n)
+            assert (replay.winner, replay.rounds, replay.cycleLength) == (result.winner, result.rounds, result.cycleLength)
+            assert replay.numRounds() in (result.rounds, result.rounds - 1)
+            for r in range(replay.numRounds() + 1):
+                if r:
+                    winner, cards = replay.round(r)
+                    assert 0 <= winner < len(states[0]) and cards >= 2
+                assert [[card.code() for card in hand] for hand in replay.stateAt(r)] == states[r]
+
+
+def test_cached_games_are_left_out(tmp_path):
+    path = str(tmp_path / "games.war")
+    cache = OutcomeCache()
+    Game(seed=5, sink=NullSink(), cache=cache).run(detect_cycles=True)
+    with ReplayWriter(path) as writer:
+        Game(seed=5, sink=writer, cache=cache).run(detect_cycles=True)  # served from the cache
+        Game(seed=202, sink=writer).run(round_limit=200)
+    with ReplayReader(path) as reader:
+        assert len(reader) == 1
+        assert reader.game(0).numRounds() == reader.game(0).rounds
+
+
+def test_rule_variants_are_refused(tmp_path):
+    # the rounds of a replay are rebuilt by the default rules, so a variant game can't be recorded
+    path = str(tmp_path / "games.war")
+    with ReplayWriter(path) as writer:
+        with pytest.raises(ValueError):
+            Game(seed=1, sink=writer, rules=Rules(face_down=1)).run(round_limit=50)
+        Game(seed=1, sink=writer, rules=Rules()).run(round_limit=50)
+    with ReplayReader(path) as reader:
+        assert len(reader) == 1
+
+
+def test_games_of_more_than_two_players_are_refused(tmp_path):
+    # Game can skip a seat's turn when a player is eliminated mid-turn, which the round records can't rebuild
+    path = str(tmp_path / "games.war")
+    with ReplayWriter(path) as writer:
+        for num_players in (3, 4):
+            with pytest.raises(ValueError):
+                Game(num_players, seed=5, sink=writer).run(round_limit=50)
+        Game(2, seed=5, sink=writer).run(round_limit=50)
+    with ReplayReader(path) as reader:
+        assert len(reader) == 1
@@ -0,0 +1,93 @@
+"""
+Rule variants change only what they are meant to; the default Rules play exactly like the README rules.
+"""
+
+import pytest
+
+from Card import Card
+from Events import NullSink, PlayerEliminatedEvent
+from Game import Game
+from OutcomeCache import OutcomeCache
+from Rules import Rules
+
+
+def hand(*values):
+    return [Card("Clubs", value) for value in values]
+
+
+def play(rules, p1values, p2values, **kwargs):
+    game = Game(sink=NullSink(), rules=rules)
+    result = game.run(hands=[hand(*p1values), hand(*p2values)], **kwargs)
+    return game, result
+
+
+def test_face_down_cards_are_laid_before_the_war_card():
+    # 5s tie, 9 and 2 go face down, then 4 beats 3 and Player 1 takes all six cards
+    game, result = play(Rules(face_down=1), [5, 9, 3], [5, 2, 4])
+    assert (result.winner, result.rounds, result.wars, result.longestWar) == (1, 1, 1, 1)
+    assert game.seats[1].handCount() == 6
+    # without enough cards to lay face down, the War is lost
+    game, result = play(Rules(face_down=3), [5, 9, 3, 8, 7], [5, 2, 4])
+    assert result.winner == 0
+
+
+class RecordingSink(object):
+    """ Sink that keeps every event. """
+    enabled = True
+
+    def __init__(self) -> None:
+        self.events = []
+
+    def emit(self, event) -> None:
+        self.events.append(event)
+
+    def flush(self) -> None:
+        pass
+
+
+def test_running_out_while_laying_face_down_is_reported():
+    sink = RecordingSink()
+    game = Game(sink=sink, rules=Rules(face_down=3))
+    result = game.run(hands=[hand(5, 9, 3, 8, 7), hand(5, 2, 4)])
+    eliminated = [event for event in sink.events if isinstance(event, PlayerEliminatedEvent)]
+    assert [(event.round, event.player) for event in eliminated] == [(1, game.seats[1].name)]
+    assert result.winner == 0
+
+
+@pytest.mark.parametrize("pickup, collected", [
+    ("reverse", [9, 2, 5, 5]),
+    ("forward", [5, 5, 2, 9]),
+    ("sorted", [9, 5, 5, 2]),
+])
+def test_pickup_order(pickup, collected):
+    game, result = play(Rules(pickup=pickup), [5, 2, 7], [5, 9, 8], round_limit=1)
+    assert [card.val for card in game.seats[1].hand] == [8] + collected
+
+
+def test_random_pickup_is_reproducible_from_the_seed():
+    first = Game(seed=3, sink=NullSink(), rules=Rules(pickup="random")).run(round_limit=500)
+    second = Game(seed=3, sink=NullSink(), rules=Rules(pickup="random")).run(round_limit=500)
+    assert first == second
+
+
+def test_aces_low():
+    game, result = play(Rules(aces_low=True), [14], [2])
+    assert result.winner == 1
+    game, result = play(Rules(), [14], [2])
+    assert result.winner == 0
+    # a low Ace still shows and encodes as an Ace
+    game, result = play(Rules(aces_low=True), [14, 3], [2, 4], round_limit=1)
+    ace = game.seats[1].hand[-1]
+    assert ace.val == 1 and ace.show() == "Ace of Clubs" and ace.code() == Card("Clubs", 14).code()
+
+
+def test_variants_bypass_the_cache():
+    cache = OutcomeCache()
+    Game(seed=0, sink=NullSink(), cache=cache).run(detect_cycles=True)
+    assert len(cache.entries) == 1
+    variant = Game(seed=0, sink=NullSink(), cache=cache, rules=Rules(face_down=1))
+    variant.run(round_limit=1000, detect_cycles=True)
+    assert not variant.cached
+    assert cache.hits == 0 and len(cache.entries) == 1
+    with pytest.raises(ValueError):
+        Rules(pickup="upside down")
@@ -0,0 +1,48 @@
+"""
+The server streams a table's events to its watchers, and answers bad commands with an error instead of failing.
+"""
+
+import asyncio
+import json
+
+from Server import GameServer
+
+
+async def session(lines:list, until) -> list:
+    # runs a server on a free port, sends lines and collects replies until until(reply) is true
+    server = GameServer(tick=0.001, rounds_per_tick=5, round_limit=200)
+    ticker = asyncio.get_running_loop().create_task(server.runTicks())
+    listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for line in lines:
+            writer.write(line.encode() + b"\n")
+        await writer.drain()
+        replies = []
+        while True:
+            reply = json.loads(await asyncio.wait_for(reader.readline(), 10))
+            replies.append(reply)
+            if until(reply):
+                return replies
+    finally:
+        writer.write(b"quit\n")
+        writer.close()
+        ticker.cancel()
+        listener.close()
+        await listener.wait_closed()
+
+
+def test_new_table_streams_its_events_to_the_watcher():
+    replies = asyncio.run(session(["new 2 1 7"], lambda reply: reply["event"] == "game-over"))
+    assert replies[0] == {"event": "table", "table": 1, "seed": 7}
+    kinds = [reply["event"] for reply in replies[1:]]
+    assert kinds[0] == "deal" and "round-won" in kinds and kinds[-1] == "game-over"
+    assert all(reply["table"] == 1 for reply in replies[1:])
+
+
+def test_bad_new_arguments_get_an_error_reply():
+    commands = ["new 0", "new 1", "new 500", "new 2 0", "new 2 -3", "new x", "watch", "watch x", "tables"]
+    replies = asyncio.run(session(commands, lambda reply: reply["event"] == "tables"))
+    assert [reply["event"] for reply in replies] == ["error"] * 8 + ["tables"]
+    assert replies[-1]["tables"] == []
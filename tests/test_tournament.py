@@ -0,0 +1,59 @@
+"""
+A Tournament plays exactly the games its shards describe, wherever they run, and merges their stats losslessly.
+"""
+
+from random import Random
+
+from Simulator import Simulator
+from Tournament import Tournament, TournamentStats, playShard, shardSeeds
+
+
+def fields(stats:TournamentStats) -> dict:
+    return dict(vars(stats))
+
+
+def serialStats(shards:list) -> TournamentStats:
+    # plays every shard's games one by one in this process, the way a worker should
+    stats = TournamentStats()
+    for num_games, seed, round_limit, detect_cycles in shards:
+        for result in Simulator(round_limit, rng=Random(seed), detect_cycles=detect_cycles).iterGames(num_games):
+            stats.add(result)
+    return stats
+
+
+def test_shards_split_the_games_evenly():
+    shards = Tournament(3, round_limit=500, detect_cycles=True).shards(11, seed=4)
+    assert [shard[0] for shard in shards] == [4, 4, 3]
+    assert [shard[1] for shard in shards] == shardSeeds(4, 3)
+    assert all(shard[2:] == (500, True) for shard in shards)
+    assert len(set(shardSeeds(4, 3))) == 3
+    # the seeds come from the master seed alone
+    assert shardSeeds(4, 3) == shardSeeds(4, 3) != shardSeeds(5, 3)
+
+
+def test_play_shard_matches_a_serial_simulator():
+    shard = (20, 99, 400, False)
+    assert fields(playShard(shard)) == fields(serialStats([shard]))
+
+
+def test_one_and_two_workers_play_their_shards_exactly():
+    for workers in (1, 2):
+        tournament = Tournament(workers, round_limit=400, detect_cycles=True)
+        stats = tournament.run(25, seed=8)
+        assert stats.games == 25
+        assert fields(stats) == fields(serialStats(tournament.shards(25, seed=8)))
+        # reproducible from (seed, workers)
+        assert fields(tournament.run(25, seed=8)) == fields(stats)
+
+
+def test_merge_adds_everything():
+    results = Simulator(300, rng=Random(2)).run(30)
+    whole = TournamentStats()
+    first = TournamentStats()
+    second = TournamentStats()
+    for idx, result in enumerate(results):
+        whole.add(result)
+        (first if idx < 12 else second).add(result)
+    assert first.merge(second) is first
+    assert fields(first) == fields(whole)
+    assert sum(whole.wins) + whole.draws == whole.games == 30